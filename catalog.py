@@ -0,0 +1,179 @@
+# Save as 'catalog.py'
+# The lock catalog, read lazily from a compact binary file (locks.bin) so
+# only the rows on screen are ever in RAM. Built once by compile_catalog()
+# (tools/build_catalog.py on the host, or on the device from locks.json).
+#
+# locks.bin layout (big endian):
+#   b"LKC2", u32 size and u32 CRC-32 of the locks.json it was built from,
+#   u8 belt count
+#   per belt: u8 name len, name, u16 lock count, u32 table offset
+#   per belt table: (count + 1) u32 record offsets (last one = end)
+#   records: u8 name len, utf-8 name
+# Lock ids are not stored: lock n of belt "Red" is "red_n". Saved progress
+# and logs are keyed by those ids, so compile_catalog() refuses a locks.json
+# whose "id"s do not match their places: new locks go at the end of a belt,
+# and a removed one has to stay as a placeholder.
+import ustruct
+from lockset import split_id
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+MAGIC = b"LKC2"
+
+def source_stamp(path):
+    # (size, CRC-32) of locks.json, to tell whether locks.bin is out of date.
+    # Without crc32 in the firmware only the size is compared
+    size = crc = 0
+    buf = bytearray(1024)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n: break
+            size += n
+            if crc32: crc = crc32(memoryview(buf)[:n], crc)
+    return size, crc & 0xFFFFFFFF
+
+def compile_catalog(locks, path, source=(0, 0)):
+    # locks: {"Red": [{"n": "..."}, ...], ...} as in locks.json; source is
+    # its source_stamp(). Raises ValueError, before writing anything, if a
+    # lock's id is not the one its place gives it
+    belts = list(locks)
+    for belt in belts:
+        key = belt.lower()
+        for n, lock in enumerate(locks[belt]):
+            lock_id = lock.get("id")
+            if lock_id is not None and lock_id != "{}_{}".format(key, n):
+                raise ValueError("{} is lock {} of {}: ids must follow the order".format(lock_id, n, belt))
+    header_len = 13 + sum(1 + len(b.encode()) + 6 for b in belts)
+    tables = []
+    offset = header_len
+    for belt in belts:
+        tables.append(offset)
+        offset += (len(locks[belt]) + 1) * 4
+    with open(path, "wb") as f:
+        f.write(MAGIC + ustruct.pack(">IIB", source[0], source[1], len(belts)))
+        for belt, table in zip(belts, tables):
+            name = belt.encode()
+            f.write(ustruct.pack(">B", len(name)) + name + ustruct.pack(">HI", len(locks[belt]), table))
+        records = []
+        for belt in belts:
+            starts = []
+            for lock in locks[belt]:
+                name = lock["n"].encode()[:255]
+                starts.append(offset)
+                records.append(ustruct.pack(">B", len(name)) + name)
+                offset += 1 + len(name)
+            starts.append(offset)
+            f.write(ustruct.pack(">{}I".format(len(starts)), *starts))
+        for rec in records: f.write(rec)
+
+class Catalog:
+    def __init__(self, path, belt_order, page_size=8, cache_pages=4):
+        # path=None gives an empty catalog (no SD card)
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.pages = {}   # (belt, page no) -> [lock dicts]
+        self.recent = []  # page keys, oldest first
+        self.counts = {}  # belt -> lock count
+        self.tables = {}  # belt -> offset of its record table
+        self.keys = {}        # belt -> id prefix ("Red" -> "red")
+        self.belt_by_key = {} # id prefix -> belt
+        self.order = []
+        self.source = None # source_stamp() of the locks.json it came from
+        if path is None: return
+        self.f = open(path, "rb")
+        try: self._read_header()
+        except Exception:
+            self.f.close()
+            raise ValueError("bad catalog")
+        self.order = [b for b in belt_order if b in self.counts]
+
+    def _read_header(self):
+        f = self.f
+        if f.read(4) != MAGIC: raise ValueError
+        size, crc, belts = ustruct.unpack(">IIB", f.read(9))
+        self.source = (size, crc)
+        table = count = 0
+        for _ in range(belts):
+            belt = f.read(f.read(1)[0]).decode()
+            count, table = ustruct.unpack(">HI", f.read(6))
+            key = belt.lower()
+            self.counts[belt] = count
+            self.tables[belt] = table
+            self.keys[belt] = key
+            self.belt_by_key[key] = belt
+        # The last record offset is the file size; a short file was cut off
+        if belts:
+            f.seek(table + count * 4)
+            end = ustruct.unpack(">I", f.read(4))[0]
+            if f.seek(0, 2) != end: raise ValueError
+
+    def close(self):
+        self.f.close()
+
+    def size(self, belt):
+        # Ids for a belt run from <key>_0 to <key>_<size-1>
+        return self.counts.get(belt, 0)
+
+    def belt_of(self, lock_id):
+        return self.belt_by_key[split_id(lock_id)[0]]
+
+    def _read_page(self, belt, page_no):
+        key = (belt, page_no)
+        rows = self.pages.get(key)
+        if rows is not None: return rows
+        start = page_no * self.page_size
+        count = min(self.page_size, self.counts[belt] - start)
+        rows = []
+        if count > 0:
+            # One read for the offsets, one for the contiguous records
+            self.f.seek(self.tables[belt] + start * 4)
+            offsets = ustruct.unpack(">{}I".format(count + 1), self.f.read((count + 1) * 4))
+            self.f.seek(offsets[0])
+            data = self.f.read(offsets[-1] - offsets[0])
+            pos = 0
+            prefix = self.keys[belt]
+            for i in range(count):
+                n = data[pos]
+                rows.append({"id": "{}_{}".format(prefix, start + i), "n": data[pos + 1:pos + 1 + n].decode()})
+                pos += 1 + n
+        if len(self.recent) >= self.cache_pages:
+            del self.pages[self.recent.pop(0)]
+        self.pages[key] = rows
+        self.recent.append(key)
+        return rows
+
+    def lock_at(self, belt, n):
+        if not 0 <= n < self.counts.get(belt, 0): return None
+        return self._read_page(belt, n // self.page_size)[n % self.page_size]
+
+    def get(self, lock_id):
+        key, n = split_id(lock_id)
+        return self.lock_at(self.belt_by_key[key], n)
+
+    def iter_locks(self):
+        # Every lock, belt by belt; for one-off migrations only
+        for belt in self.order:
+            for n in range(self.counts[belt]):
+                yield self.lock_at(belt, n)
+
+    def rank(self, picked):
+        # Highest belt with at least one pick
+        for belt in reversed(self.order):
+            if picked.count_belt(self.keys[belt]): return belt
+        return "White"
+
+    def belts_covered(self, lockset):
+        return sum(1 for belt in self.order if lockset.count_belt(self.keys[belt]))
+
+    def collection(self, owned):
+        # Ids of owned locks in belt order; walks only the set bits
+        out = []
+        for belt in self.order:
+            key = self.keys[belt]
+            for n in owned.members(key):
+                if n < self.counts[belt]: out.append("{}_{}".format(key, n))
+        return out
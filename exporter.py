@@ -0,0 +1,74 @@
+# Save as 'exporter.py'
+# Streaming logbook export to CSV or newline-delimited JSON. Entries are read
+# a page at a time and rows are written in CHUNK sized writes, so neither RAM
+# nor the number of SD writes grows with the logbook.
+#
+# Every entry carries a serial number "no" (older entries have none, = 0).
+# An incremental export appends only entries numbered above the watermark
+# the previous export returned; None means nothing was exported yet (0 is a
+# watermark: every old entry is out).
+import os, json
+
+CHUNK = 4096 # bytes per write
+PAGE = 16    # entries read per call
+
+def csv_field(v):
+    v = "" if v is None else str(v)
+    if ',' in v or '"' in v or '\n' in v: return '"' + v.replace('"', '""') + '"'
+    return v
+
+def csv_row(lock_name, e):
+    return ",".join(csv_field(v) for v in (
+        lock_name, e['date'], e.get('dur', ''), e.get('tool', ''),
+        e.get('p_size', ''), e.get('tension', ''), e.get('rating', ''))) + "\n"
+
+def ndjson_row(lock_name, e):
+    row = dict(e)
+    row["lock"] = lock_name
+    return json.dumps(row) + "\n"
+
+# format -> (file extension, first line, row formatter)
+FORMATS = {
+    "csv": (".csv", "Lock Name,Date,Time,Tool,Pick Size,Tension,Rating\n", csv_row),
+    "ndjson": (".ndjson", "", ndjson_row),
+}
+
+def export(base, fmt, names, read, since=None, progress=None):
+    # names: locks with entries; read(name, start, count) -> entries, newest
+    # first. progress(locks done, locks) is called after each lock. Returns
+    # (path, rows written, new watermark or None while nothing is out)
+    ext, header, row = FORMATS[fmt]
+    path = base + ext
+    if since is not None:
+        try: os.stat(path)
+        except OSError: since = None # nothing to append to: export everything
+    mark = since
+    rows = size = 0
+    parts = []
+    append = since is not None
+    with open(path, "a" if append else "w") as f:
+        if not append and header: parts.append(header); size = len(header)
+        for i, name in enumerate(names):
+            start = 0
+            while True:
+                entries = read(name, start, PAGE)
+                for e in entries:
+                    no = e.get('no', 0)
+                    # Newest first: the rest of this lock is already out
+                    if append and no <= since:
+                        entries = ()
+                        break
+                    text = row(name, e)
+                    parts.append(text)
+                    size += len(text)
+                    rows += 1
+                    if mark is None or no > mark: mark = no
+                    if size >= CHUNK:
+                        f.write("".join(parts))
+                        parts = []
+                        size = 0
+                if len(entries) < PAGE: break
+                start += PAGE
+            if progress: progress(i + 1, len(names))
+        if parts: f.write("".join(parts))
+    return path, rows, mark
@@ -1,8 +1,75 @@
+import kernels
+
 byte_font = bytearray([
 0,0,0,0,0,0,0,0,24,60,60,24,24,0,24,0,102,102,102,36,0,0,0,0,108,108,254,108,254,108,108,0,24,62,96,60,6,124,24,0,0,198,204,24,48,102,198,0,56,108,56,118,220,204,118,0,24,24,48,0,0,0,0,0,12,24,48,48,48,24,12,0,48,24,12,12,12,24,48,0,0,102,60,255,60,102,0,0,0,24,24,126,24,24,0,0,0,0,0,0,0,24,24,48,0,0,0,126,0,0,0,0,0,0,0,0,0,24,24,0,6,12,24,48,96,192,128,0,60,102,195,211,219,207,102,60,24,56,24,24,24,24,126,0,60,102,6,28,48,102,126,0,60,102,6,28,6,102,60,0,12,28,60,108,254,12,12,0,126,96,124,6,6,102,60,0,60,96,252,102,102,102,60,0,126,6,12,24,48,48,48,0,60,102,102,60,102,102,60,0,60,102,102,102,62,6,60,0,0,24,24,0,0,24,24,0,0,24,24,0,0,24,24,48,12,24,48,96,48,24,12,0,0,0,126,0,126,0,0,0,48,24,12,6,12,24,48,0,60,102,6,12,24,0,24,0,60,102,110,110,96,98,60,0,24,60,102,102,126,102,102,0,252,102,102,124,102,102,252,0,60,102,96,96,96,102,60,0,248,108,102,102,102,108,248,0,126,96,96,120,96,96,126,0,126,96,96,120,96,96,96,0,60,102,96,110,102,102,60,0,102,102,102,126,102,102,102,0,60,24,24,24,24,24,60,0,30,12,12,12,204,204,120,0,230,102,108,120,108,102,230,0,240,96,96,96,98,102,254,0,198,238,254,214,198,198,198,0,198,230,246,222,206,198,198,0,60,102,102,102,102,102,60,0,252,102,102,124,96,96,96,0,60,102,102,102,102,60,14,0,252,102,102,124,108,102,230,0,60,102,96,60,6,102,60,0,126,24,24,24,24,24,24,0,102,102,102,102,102,102,60,0,102,102,102,102,102,60,24,0,198,198,198,214,254,238,198,0,198,198,108,56,108,198,198,0,204,204,204,120,48,48,120,0,254,6,12,24,48,96,254,0,60,48,48,48,48,48,60,0,0,128,192,96,48,24,12,6,60,12,12,12,12,12,60,0,16,40,68,0,0,0,0,0,0,0,0,0,0,0,0,255,24,12,6,0,0,0,0,0,0,0,60,6,62,102,62,0,96,96,124,102,102,102,124,0,0,0,60,96,96,96,60,0,6,6,62,102,102,102,62,0,0,0,60,102,126,96,60,0,28,54,48,120,48,48,48,0,0,0,62,102,102,62,6,124,96,96,118,102,102,102,102,0,24,0,56,24,24,24,60,0,6,0,6,6,6,102,60,0,96,96,102,108,120,108,102,0,56,24,24,24,24,24,60,0,0,0,236,254,214,214,214,0,0,0,220,102,102,102,102,0,0,0,60,102,102,102,60,0,0,0,220,102,102,124,96,96,0,0,118,102,102,124,6,6,0,0,220,102,96,96,96,0,0,0,62,96,60,6,124,0,48,48,120,48,48,54,28,0,0,0,102,102,102,102,62,0,0,0,102,102,102,60,24,0,0,0,198,214,254,238,198,0,0,0,198,108,56,108,198,0,0,0,102,102,102,62,6,124,0,0,126,12,24,48,126,0,12,24,24,112,24,24,12,0,24,24,24,24,24,24,24,24,48,24,24,14,24,24,48,0,49,100,72,0,0,0,0,0,
 ])
 
 def get_char(c):
-    idx = ord(c) - 32
-    if idx < 0 or idx >= 95: idx = 0 
-    return byte_font[idx*8:(idx+1)*8]
+    return get_code(ord(c))
+
+def glyph_offset(code):
+    idx = code - 32
+    if idx < 0 or idx >= 95: idx = 0
+    return idx * 8
+
+def get_code(code):
+    offset = glyph_offset(code)
+    return byte_font[offset:offset + 8]
+
+def expand(code, color, bg_color):
+    # Glyph for code -> 128 byte RGB565 buffer
+    buf = bytearray(128)
+    kernels.expand_glyph(byte_font, glyph_offset(code), buf, color, bg_color)
+    return buf
+
+class GlyphCache:
+    # Expanded glyphs keyed by (char code, fg, bg). Least recently used go
+    # first once the byte budget is spent. Keys are small ints (code plus a
+    # palette number) so a cache hit allocates nothing.
+    def __init__(self, budget=16384):
+        self.budget = budget
+        self.glyphs = {}
+        self.palettes = {}
+        self.palette_count = 0
+        self.tick = 0
+        self.hits = 0
+        self.misses = 0
+
+    def palette(self, color, bg_color):
+        by_bg = self.palettes.get(color)
+        if by_bg is None:
+            by_bg = self.palettes[color] = {}
+        pal = by_bg.get(bg_color)
+        if pal is None:
+            pal = by_bg[bg_color] = self.palette_count
+            self.palette_count += 1
+        return pal
+
+    def get(self, c, color, bg_color):
+        return self.get_code(ord(c), self.palette(color, bg_color), color, bg_color)
+
+    def get_code(self, code, pal, color, bg_color):
+        self.tick += 1
+        key = (pal << 21) | code
+        entry = self.glyphs.get(key)
+        if entry:
+            self.hits += 1
+            entry[1] = self.tick
+            return entry[0]
+        self.misses += 1
+        while self.glyphs and (len(self.glyphs) + 1) * 128 > self.budget:
+            self.evict()
+        buf = memoryview(expand(code, color, bg_color))
+        self.glyphs[key] = [buf, self.tick]
+        return buf
+
+    def evict(self):
+        oldest = None
+        for key, entry in self.glyphs.items():
+            if oldest is None or entry[1] < self.glyphs[oldest][1]: oldest = key
+        del self.glyphs[oldest]
+
+    def clear(self):
+        self.glyphs = {}
+        self.hits = 0
+        self.misses = 0
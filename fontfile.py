@@ -0,0 +1,96 @@
+# Save as 'fontfile.py'
+# Fonts kept in a file (SD card or flash) for Display.draw_text(font=...),
+# made on a computer by tools/bdf2font.py. Glyphs have their own widths and
+# 1 or 2 bits per pixel (2 = antialiased: four shades from the background to
+# the text color). Glyphs are read a page at a time, only when a string
+# needs them, and at most budget bytes of pages are kept.
+#
+#   'F' 'N'  magic
+#   height, bits per pixel (1 or 2), first char code (2 bytes),
+#   glyph count (2 bytes), glyphs per page (all big-endian)
+#   glyph count x width (1 byte, includes the space after it)
+#   (pages + 1) x file offset of a page's bitmaps (4 bytes)
+#   then the bitmaps: each glyph is height rows of (width * bpp + 7) // 8
+#   bytes, leftmost pixel in the high bits
+import ustruct
+
+HEAD = ">2sBBHHB"
+
+class FontFile:
+    def __init__(self, path, budget=4096):
+        self.f = open(path, "rb")
+        head = self.f.read(ustruct.calcsize(HEAD))
+        magic, self.height, self.bpp, self.first, count, self.page_size = ustruct.unpack(HEAD, head)
+        if magic != b"FN": raise ValueError("not a font file")
+        self.count = count
+        self.widths = self.f.read(count)
+        pages = (count + self.page_size - 1) // self.page_size
+        self.offsets = ustruct.unpack(">{}I".format(pages + 1), self.f.read((pages + 1) * 4))
+        # Unknown chars are drawn as '?' (or the first glyph)
+        q = ord('?') - self.first
+        self.missing = q if 0 <= q < count else 0
+        self.budget = budget
+        self.pages = {} # page -> [bitmaps, glyph offsets in them, last use]
+        self.size = 0
+        self.tick = 0
+        self.hits = 0
+        self.misses = 0
+
+    def row_bytes(self, width):
+        return (width * self.bpp + 7) // 8
+
+    def index(self, code):
+        i = code - self.first
+        return i if 0 <= i < self.count else self.missing
+
+    def width(self, text):
+        w = 0
+        for c in text: w += self.widths[self.index(ord(c))]
+        return w
+
+    def fit(self, text, px):
+        # Longest start of text that is at most px wide
+        w = 0
+        for i in range(len(text)):
+            w += self.widths[self.index(ord(text[i]))]
+            if w > px: return text[:i]
+        return text
+
+    def glyph(self, code):
+        # (bitmaps, offset, width) of the glyph for code
+        i = self.index(code)
+        page = self._page(i // self.page_size)
+        return page[0], page[1][i % self.page_size], self.widths[i]
+
+    def _page(self, n):
+        self.tick += 1
+        page = self.pages.get(n)
+        if page is not None:
+            self.hits += 1
+            page[2] = self.tick
+            return page
+        self.misses += 1
+        start, end = self.offsets[n], self.offsets[n + 1]
+        while self.pages and self.size + end - start > self.budget:
+            self._evict()
+        self.f.seek(start)
+        data = self.f.read(end - start)
+        offsets = []
+        off = 0
+        for i in range(n * self.page_size, min(self.count, (n + 1) * self.page_size)):
+            offsets.append(off)
+            off += self.height * self.row_bytes(self.widths[i])
+        page = self.pages[n] = [data, offsets, self.tick]
+        self.size += len(data)
+        return page
+
+    def _evict(self):
+        oldest = None
+        for n, page in self.pages.items():
+            if oldest is None or page[2] < self.pages[oldest][2]: oldest = n
+        self.size -= len(self.pages.pop(oldest)[0])
+
+    def close(self):
+        self.f.close()
+        self.pages = {}
+        self.size = 0
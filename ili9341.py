@@ -2,18 +2,62 @@
 import time
 import ustruct
 import font
+import kernels
+
+FILL_CHUNK = 256 # pixels per preallocated fill buffer
+FILL_SLOTS = 12  # fill buffers kept, one per recently used color
+VIEW_SLOTS = 16  # memoryviews of one buffer kept, one per length sent
+SHADE_SLOTS = 8  # file font lookup tables kept, one per color pair
+
+# Recorded primitives while compositing
+OP_FILL = 0
+OP_TEXT = 1
+OP_CELLS = 2
+OP_SPRITE = 3
+OP_FONT = 4
 
 def color565(r, g, b):
     return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
 
+def blend565(a, b, n, d):
+    # n/d of the way from color a to color b
+    r = ((a >> 11) * (d - n) + (b >> 11) * n) // d
+    g = ((a >> 5 & 0x3F) * (d - n) + (b >> 5 & 0x3F) * n) // d
+    bl = ((a & 0x1F) * (d - n) + (b & 0x1F) * n) // d
+    return r << 11 | g << 5 | bl
+
 class Display:
-    def __init__(self, spi, dc, cs, rst=None, width=240, height=320, rotation=0):
+    def __init__(self, spi, dc, cs, rst=None, width=240, height=320, rotation=0, glyph_budget=16384, strip_budget=9600):
         self.spi = spi
         self.dc = dc
         self.cs = cs
         self.rst = rst
         self.width = width
         self.height = height
+        self.glyphs = font.GlyphCache(glyph_budget)
+        # Preallocated scratch so steady-state drawing allocates nothing
+        self._cmd = bytearray(1)
+        self._args = bytearray(4)
+        self._scroll_args = bytearray(6)
+        self._scroll_head = memoryview(self._scroll_args)[:2]
+        self._fills = {} # color -> [fill buffer, its views, last use]
+        self._fill_tick = 0
+        self.fill_misses = 0
+        self._shades = {}
+        self._text_buf = bytearray(width * 16)
+        self._text_views = {}
+        self._blit_buf = bytearray(0)
+        self._blit_views = {}
+        # Compositing: primitives are recorded into _frame and pushed as strips
+        self._frame = None
+        self._strip_rows = max(1, strip_budget // (width * 2))
+        self._strip_buf = None
+        self._strip_views = {}
+        # Hardware scrolling: lines scroll_top..scroll_top+scroll_h-1 form a
+        # ring; scroll_line is the one shown at the top of it
+        self.scroll_top = 0
+        self.scroll_h = height
+        self.scroll_line = 0
         if self.rst:
             self.rst.init(self.rst.OUT, value=0)
             self.cs.init(self.cs.OUT, value=1)
@@ -39,7 +83,8 @@ class Display:
     def _write(self, cmd, data=None):
         self.cs(0)
         self.dc(0)
-        self.spi.write(bytearray([cmd]))
+        self._cmd[0] = cmd
+        self.spi.write(self._cmd)
         if data:
             self.dc(1)
             self.spi.write(data)
@@ -52,65 +97,406 @@ class Display:
         time.sleep_ms(50)
 
     def _set_window(self, x0, y0, x1, y1):
-        self._write(0x2A, ustruct.pack(">HH", x0, x1))
-        self._write(0x2B, ustruct.pack(">HH", y0, y1))
+        ustruct.pack_into(">HH", self._args, 0, x0, x1)
+        self._write(0x2A, self._args)
+        ustruct.pack_into(">HH", self._args, 0, y0, y1)
+        self._write(0x2B, self._args)
         self._write(0x2C)
 
+    def _head(self, views, buf, n):
+        # The first n bytes of buf as a memoryview. Slicing allocates on
+        # MicroPython, so the views are kept per length (views is the dict
+        # for buf) and a size sent again costs nothing
+        view = views.get(n)
+        if view is None:
+            if len(views) >= VIEW_SLOTS:
+                for old in views:
+                    del views[old]
+                    break
+            view = views[n] = memoryview(buf)[:n]
+        return view
+
+    def _fill_slot(self, color):
+        # [FILL_CHUNK pixels of color, views of it, last use]. The least
+        # recently used buffer is refilled in place for a new color
+        self._fill_tick += 1
+        slot = self._fills.get(color)
+        if slot is None:
+            self.fill_misses += 1
+            if len(self._fills) >= FILL_SLOTS:
+                oldest = None
+                for c in self._fills:
+                    if oldest is None or self._fills[c][2] < self._fills[oldest][2]: oldest = c
+                slot = self._fills.pop(oldest)
+            else:
+                raw = memoryview(bytearray(FILL_CHUNK * 2))
+                slot = [raw, {}, 0]
+            raw = slot[0]
+            raw[0] = (color >> 8) & 0xFF
+            raw[1] = color & 0xFF
+            # Doubling copies: a few steps instead of one per pixel
+            n = 2
+            while n < FILL_CHUNK * 2:
+                raw[n:2 * n] = raw[0:n]
+                n *= 2
+            self._fills[color] = slot
+        slot[2] = self._fill_tick
+        return slot
+
+    def _fill_buffer(self, color):
+        return self._fill_slot(color)[0]
+
     def fill_rectangle(self, x, y, w, h, color):
         x = min(self.width - 1, max(0, x))
         y = min(self.height - 1, max(0, y))
         w = min(self.width - x, max(1, w))
         h = min(self.height - y, max(1, h))
         if w == 0 or h == 0: return
+        if self._frame is not None:
+            self._frame.append((OP_FILL, x, y, w, h, color))
+            return
         self._set_window(x, y, x + w - 1, y + h - 1)
         
-        # Fast Block Write
-        chunk_size = 1024
-        line_buffer = ustruct.pack(">H", color) * chunk_size
+        # Fast Block Write from the cached buffer for this color
+        slot = self._fill_slot(color)
+        line_buffer = slot[0]
         pixels_total = w * h
         
         self.cs(0)
         self.dc(1)
-        while pixels_total > 0:
-            write_len = min(pixels_total, chunk_size)
-            self.spi.write(line_buffer[:write_len * 2])
-            pixels_total -= write_len
+        while pixels_total >= FILL_CHUNK:
+            self.spi.write(line_buffer)
+            pixels_total -= FILL_CHUNK
+        if pixels_total: self.spi.write(self._head(slot[1], line_buffer, pixels_total * 2))
         self.cs(1)
 
     # --- THE SPEED UPGRADE ---
     def draw_char(self, char, x, y, color, bg_color):
+        if self._frame is not None:
+            self.draw_text(char, x, y, color, bg_color)
+            return
         # 1. Set the 8x8 window for the character
         self._set_window(x, y, x + 7, y + 7)
-        
-        # 2. Get the font data
-        bitmap = font.get_char(char)
-        
-        # 3. Pre-calculate the color bytes
-        c_high, c_low = (color >> 8) & 0xFF, color & 0xFF
-        bg_high, bg_low = (bg_color >> 8) & 0xFF, bg_color & 0xFF
-        
-        # 4. Build a buffer for the WHOLE character at once (128 bytes)
-        buf = bytearray(128) 
-        idx = 0
-        
-        for row in range(8):
-            row_data = bitmap[row]
-            for col in range(8):
-                if row_data & (1 << (7 - col)): # If pixel is ON
-                    buf[idx] = c_high
-                    buf[idx+1] = c_low
-                else: # If pixel is OFF
-                    buf[idx] = bg_high
-                    buf[idx+1] = bg_low
-                idx += 2
-        
-        # 5. Send it all in one shot
+
+        # 2. Expanded glyph comes straight from the cache (128 bytes)
+        buf = self.glyphs.get(char, color, bg_color)
+
+        # 3. Send it all in one shot
         self.cs(0)
         self.dc(1)
         self.spi.write(buf)
         self.cs(1)
 
-    def draw_text(self, text, x, y, color, bg_color=None):
+    def draw_text(self, text, x, y, color, bg_color=None, font=None):
         if bg_color is None: bg_color = 0x0000 # Default to black background if None
-        for i, char in enumerate(text):
-            self.draw_char(char, x + (i * 8), y, color, bg_color)
+        if font is not None:
+            self._draw_font(text, x, y, color, bg_color, font)
+            return
+        # Only whole characters that fit on the panel are drawn
+        count = min(len(text), (self.width - x) // 8)
+        if count <= 0: return
+        if self._frame is not None:
+            self._frame.append((OP_TEXT, x, y, count * 8, 8, text, color, bg_color))
+            return
+
+        # 1. One window for the whole string
+        self._set_window(x, y, x + (count * 8) - 1, y + 7)
+
+        # 2. Lay cached glyphs out row by row in the shared text buffer:
+        #    each panel row holds one row of every char
+        glyphs = self.glyphs
+        pal = glyphs.palette(color, bg_color)
+        buf = self._text_buf
+        stride = count * 16
+        for i in range(count):
+            glyph = glyphs.get_code(ord(text[i]), pal, color, bg_color)
+            kernels.copy_rows(buf, i * 16, stride, glyph, 0, 16, 16, 8)
+
+        # 3. Stream every glyph row in a single write
+        self.cs(0)
+        self.dc(1)
+        self.spi.write(self._head(self._text_views, buf, stride * 8))
+        self.cs(1)
+
+    # --- FILE FONTS (fontfile.py) ---
+    def fit_text(self, text, px, font=None):
+        # Longest start of text that fits in px pixels
+        return text[:px // 8] if font is None else font.fit(text, px)
+
+    def _draw_font(self, text, x, y, color, bg_color, font):
+        glyphs = self._font_glyphs(text, self.width - x, font)
+        w = 0
+        for g in glyphs: w += g[2]
+        if w == 0: return
+        h = font.height
+        if self._frame is not None:
+            self._frame.append((OP_FONT, x, y, w, h, glyphs, color, bg_color, font))
+            return
+        # One window, sent in runs of as many rows as the text buffer holds
+        self._set_window(x, y, x + w - 1, y + h - 1)
+        table = self._shade_table(font.bpp, color, bg_color)
+        buf = self._text_buf
+        stride = w * 2
+        rows = len(buf) // stride
+        self.cs(0)
+        self.dc(1)
+        for row in range(0, h, rows):
+            n = min(rows, h - row)
+            for i in range(n):
+                self._font_row(font, glyphs, row + i, buf, i * stride, table)
+            self.spi.write(self._head(self._text_views, buf, stride * n))
+        self.cs(1)
+
+    def _font_glyphs(self, text, px, font):
+        # Glyphs of the whole characters that fit in px pixels
+        glyphs = []
+        for c in text:
+            g = font.glyph(ord(c))
+            px -= g[2]
+            if px < 0: break
+            glyphs.append(g)
+        return glyphs
+
+    def _shade_table(self, bpp, color, bg_color):
+        # Pixels for every 4-bit half of a bitmap byte: 16 x (4 // bpp)
+        # pixels, 128 bytes at most. With 2 bpp the middle shades are blends
+        # of bg_color and color. An evicted table is refilled in place
+        key = (bpp, color, bg_color)
+        table = self._shades.get(key)
+        if table is not None: return table
+        if len(self._shades) >= SHADE_SLOTS:
+            for old in self._shades:
+                table = self._shades.pop(old)
+                break
+        else:
+            table = memoryview(bytearray(128))
+        levels = (1 << bpp) - 1
+        shades = [blend565(bg_color, color, s, levels) for s in range(levels + 1)]
+        i = 0
+        for b in range(16):
+            for p in range(4 // bpp):
+                c = shades[(b >> (4 - bpp * (p + 1))) & levels]
+                table[i] = c >> 8
+                table[i+1] = c & 0xFF
+                i += 2
+        self._shades[key] = table
+        return table
+
+    def _font_row(self, font, glyphs, row, buf, off, table):
+        # One pixel row of the glyphs into buf at off, half a bitmap byte
+        # (span bytes of pixels) at a time
+        span = 8 // font.bpp
+        for data, start, w in glyphs:
+            rb = font.row_bytes(w)
+            src = start + row * rb
+            left = w * 2
+            for j in range(src, src + rb):
+                b = data[j]
+                t = (b >> 4) * span
+                n = min(span, left)
+                kernels.copy_rows(buf, off, 0, table, t, 0, n, 1)
+                off += n
+                left -= n
+                if left <= 0: break
+                t = (b & 15) * span
+                n = min(span, left)
+                kernels.copy_rows(buf, off, 0, table, t, 0, n, 1)
+                off += n
+                left -= n
+
+    def blit_cells(self, x, y, cols, rows, cells, size, color, bg_color):
+        # Scaled on/off grid (big digits, icons) as one window, one write.
+        # cells is a bytes-like, one byte per cell
+        w = cols * size
+        h = rows * size
+        if self._frame is not None:
+            self._frame.append((OP_CELLS, x, y, w, h, cells, cols, size, color, bg_color))
+            return
+        total = w * h * 2
+        buf = self._blit(total)
+        kernels.expand_cells(buf, 0, w * 2, cells, cols, size, 0, h, color, bg_color)
+        self._set_window(x, y, x + w - 1, y + h - 1)
+        self.cs(0)
+        self.dc(1)
+        self.spi.write(self._head(self._blit_views, buf, total))
+        self.cs(1)
+
+    def _blit(self, total):
+        # Scratch for blit_cells/blit_sprite, grown (never shrunk) to the
+        # largest image drawn
+        if len(self._blit_buf) < total:
+            self._blit_buf = bytearray(total)
+            self._blit_views = {}
+        return self._blit_buf
+
+    def blit_sprite(self, sprite, x, y, scale=1, colors=None, bg=None):
+        # RLE sprite (sprite.py) scaled up by scale (at most 16), one window.
+        # colors replaces its palette. Transparent pixels get bg; with no bg
+        # they keep what was drawn under them inside a frame, and come out
+        # black when drawing straight to the panel
+        w = sprite.width * scale
+        h = sprite.height * scale
+        if colors is None: colors = sprite.palette
+        if self._frame is not None:
+            self._frame.append((OP_SPRITE, x, y, w, h, sprite, scale, colors, bg))
+            return
+        line = w * 2
+        total = line * scale
+        buf = self._blit(total)
+        mv = self._head(self._blit_views, buf, total)
+        self._set_window(x, y, x + w - 1, y + h - 1)
+        self.cs(0)
+        self.dc(1)
+        for row in range(sprite.height):
+            # Decode the row once, repeat it scale times
+            self._sprite_row(sprite, row, buf, 0, scale, colors, 0 if bg is None else bg)
+            kernels.copy_rows(buf, line, line, buf, 0, 0, line, scale - 1)
+            self.spi.write(mv)
+        self.cs(1)
+
+    def _sprite_row(self, sprite, row, buf, off, scale, colors, bg):
+        # bg None: transparent runs are skipped, leaving buf as it was
+        data = sprite.data
+        t = sprite.transparent
+        for i in range(sprite.rows[row], sprite.rows[row + 1]):
+            run = data[i]
+            idx = run & 15
+            n = ((run >> 4) + 1) * scale * 2
+            if idx == t:
+                if bg is None:
+                    off += n
+                    continue
+                color = bg
+            else:
+                color = colors[idx]
+            kernels.copy_rows(buf, off, 0, self._fill_buffer(color), 0, 0, n, 1)
+            off += n
+
+    # --- HARDWARE SCROLLING ---
+    # The panel shows frame memory lines scroll_top..scroll_top+scroll_h-1
+    # starting from scroll_line and wrapping around, so moving content by n
+    # lines is one command plus drawing the n lines that come into view.
+    # Drawing still addresses frame memory, not what is on the glass.
+    def set_scroll_area(self, top, bottom):
+        # Lines above top and the bottom lines stay fixed (VSCRDEF)
+        self.scroll_top = top
+        self.scroll_h = self.height - top - bottom
+        ustruct.pack_into(">HHH", self._scroll_args, 0, top, self.scroll_h, bottom)
+        self._write(0x33, self._scroll_args)
+        self.scroll(top)
+
+    def scroll(self, line):
+        # Show memory line `line` first in the scroll area (VSCRSADD)
+        self.scroll_line = line
+        ustruct.pack_into(">H", self._scroll_args, 0, line)
+        self._write(0x37, self._scroll_head)
+
+    def reset_scroll(self):
+        # Back to memory line y shown at panel line y
+        if self.scroll_line != self.scroll_top: self.scroll(self.scroll_top)
+
+    # --- COMPOSITING ---
+    # Between begin_frame() and end_frame() fill_rectangle, draw_text,
+    # blit_cells and blit_sprite are only recorded. end_frame() paints them
+    # in order into a RAM strip of strip_budget bytes and sends each strip
+    # once, so overdrawn pixels never reach the wire and the panel never
+    # shows half-drawn screens.
+    def begin_frame(self):
+        self._frame = []
+
+    def end_frame(self, y0=0, y1=None):
+        # Only lines y0..y1-1 are sent (scrolling exposes a few at a time)
+        ops = self._frame
+        self._frame = None
+        if not ops: return
+        if self._strip_buf is None:
+            self._strip_buf = bytearray(self.width * self._strip_rows * 2)
+        if y1 is None: y1 = self.height
+        y = y0
+        while y < y1:
+            self._flush_strip(ops, y, min(y1, y + self._strip_rows))
+            y += self._strip_rows
+
+    def _flush_strip(self, ops, sy0, sy1):
+        # Skip everything below the last fill that covers the whole strip
+        first = -1
+        for i in range(len(ops)):
+            op = ops[i]
+            if (op[0] == OP_FILL and op[1] == 0 and op[3] == self.width
+                    and op[2] <= sy0 and op[2] + op[4] >= sy1):
+                first = i
+        covered = first >= 0
+        if not covered: first = 0
+
+        # Bounding box of what is left, clipped to the strip
+        bx0, by0, bx1, by1 = self.width, sy1, 0, sy0
+        for i in range(first, len(ops)):
+            op = ops[i]
+            y0 = max(op[2], sy0)
+            y1 = min(op[2] + op[4], sy1)
+            if y0 >= y1: continue
+            bx0 = min(bx0, op[1])
+            bx1 = max(bx1, op[1] + op[3])
+            by0 = min(by0, y0)
+            by1 = max(by1, y1)
+        if bx0 >= bx1: return
+
+        buf = self._strip_buf
+        stride = (bx1 - bx0) * 2
+        for i in range(first, len(ops)):
+            op = ops[i]
+            x, y, w, h = op[1], op[2], op[3], op[4]
+            y0 = max(y, by0)
+            y1 = min(y + h, by1)
+            if y0 >= y1: continue
+            off = (y0 - by0) * stride + (x - bx0) * 2
+            if op[0] == OP_FILL:
+                kernels.copy_rows(buf, off, stride, self._fill_buffer(op[5]), 0, 0, w * 2, y1 - y0)
+            elif op[0] == OP_CELLS:
+                kernels.expand_cells(buf, off, stride, op[5], op[6], op[7], y0 - y, y1 - y, op[8], op[9])
+            elif op[0] == OP_SPRITE:
+                sprite, scale, colors, bg_color = op[5], op[6], op[7], op[8]
+                for row in range(y0 - y, y1 - y):
+                    self._sprite_row(sprite, row // scale, buf, off, scale, colors, bg_color)
+                    off += stride
+            elif op[0] == OP_FONT:
+                glyphs, font = op[5], op[8]
+                table = self._shade_table(font.bpp, op[6], op[7])
+                for row in range(y0 - y, y1 - y):
+                    self._font_row(font, glyphs, row, buf, off, table)
+                    off += stride
+            else:
+                text, color, bg_color = op[5], op[6], op[7]
+                glyphs = self.glyphs
+                pal = glyphs.palette(color, bg_color)
+                for c in range(w // 8):
+                    glyph = glyphs.get_code(ord(text[c]), pal, color, bg_color)
+                    kernels.copy_rows(buf, off + c * 16, stride, glyph, (y0 - y) * 16, 16, 16, y1 - y0)
+
+        if covered:
+            # Every pixel in the box is known: one window, one write
+            self._set_window(bx0, by0, bx1 - 1, by1 - 1)
+            self.cs(0)
+            self.dc(1)
+            self.spi.write(self._head(self._strip_views, buf, stride * (by1 - by0)))
+            self.cs(1)
+            return
+        # Gaps between primitives hold stale data, so only send their rects,
+        # a row at a time through the text buffer
+        line = self._text_buf
+        for i in range(first, len(ops)):
+            op = ops[i]
+            x, y, w, h = op[1], op[2], op[3], op[4]
+            y0 = max(y, by0)
+            y1 = min(y + h, by1)
+            if y0 >= y1: continue
+            self._set_window(x, y0, x + w - 1, y1 - 1)
+            off = (y0 - by0) * stride + (x - bx0) * 2
+            row = self._head(self._text_views, line, w * 2)
+            self.cs(0)
+            self.dc(1)
+            for _ in range(y1 - y0):
+                kernels.copy_rows(line, 0, 0, buf, off, 0, w * 2, 1)
+                self.spi.write(row)
+                off += stride
+            self.cs(1)
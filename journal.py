@@ -0,0 +1,111 @@
+# Save as 'journal.py'
+# Append-only persistence: a JSON snapshot plus a log of small operations
+# written after it. Every change costs one short line on the SD card; the
+# log is folded back into the snapshot once it grows past a threshold.
+#
+# Crash safety:
+# - each op carries a sequence number and the snapshot records the last
+#   one it contains, so ops already folded in are skipped on replay
+# - a torn last line (power lost mid-write) fails to parse and is dropped;
+#   the next write starts on a new line so it is not merged into it
+# - snapshots are written to a temp file first and swapped in afterwards
+import os, json
+
+class Journal:
+    def __init__(self, snapshot_path, log_path, threshold=8192):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.tmp_path = snapshot_path + ".tmp"
+        self.threshold = threshold
+        self.seq = 0
+        self.size = 0
+        self.damaged = False
+        self.torn = False # the log may end in part of a line
+        self.body_offset = 0 # end of the state line; older files had logs after it
+
+    def load_snapshot(self):
+        # Returns the saved dict, or None if there is none yet. Only the first
+        # line is parsed
+        for path in (self.snapshot_path, self.tmp_path):
+            try:
+                with open(path, "rb") as f:
+                    line = f.readline()
+                data = json.loads(line.decode())
+            except (OSError, ValueError): continue
+            if path == self.tmp_path:
+                # Power was lost mid swap: finish it
+                os.rename(self.tmp_path, self.snapshot_path)
+            self.seq = data.pop("seq", 0)
+            self.body_offset = len(line)
+            return data
+        return None
+
+    def replay(self, apply):
+        # Feed every op written after the snapshot to apply(op), one at a time
+        self.size = 0
+        self.damaged = False
+        self.torn = False
+        try:
+            f = open(self.log_path, "r")
+        except OSError:
+            return 0
+        count = 0
+        with f:
+            while True:
+                line = f.readline()
+                if not line: break
+                self.size += len(line)
+                self.torn = not line.endswith("\n")
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    self.damaged = True # torn write: drop it, compact soon
+                    continue
+                if op.get("seq", 0) <= self.seq: continue
+                self.seq = op["seq"]
+                apply(op)
+                count += 1
+        return count
+
+    def stamp(self, op):
+        # Give op its sequence number at the moment it is applied in RAM
+        self.seq += 1
+        op["seq"] = self.seq
+
+    def write(self, ops):
+        # Append already stamped ops in one open/write. Until it is known to
+        # have gone through, the log counts as torn
+        lines = "".join(json.dumps(op) + "\n" for op in ops)
+        if self.torn: lines = "\n" + lines
+        self.torn = True
+        with open(self.log_path, "a") as f:
+            f.write(lines)
+        self.torn = False
+        self.size += len(lines)
+
+    def needs_compact(self):
+        return self.damaged or self.size > self.threshold
+
+    def snapshot_text(self, data):
+        # Serialize state together with the last seq it contains
+        data["seq"] = self.seq
+        return json.dumps(data)
+
+    def write_snapshot(self, text):
+        self.write_tmp(text)
+        self.swap()
+
+    def write_tmp(self, text):
+        with open(self.tmp_path, "w") as f:
+            f.write(text + "\n")
+
+    def swap(self):
+        # Swap in the new snapshot, then start an empty log
+        try: os.remove(self.snapshot_path)
+        except OSError: pass
+        os.rename(self.tmp_path, self.snapshot_path)
+        with open(self.log_path, "w"):
+            pass
+        self.size = 0
+        self.damaged = False
+        self.torn = False
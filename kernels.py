@@ -0,0 +1,63 @@
+# Save as 'kernels.py'
+# Pixel expansion loops used by the display driver. The versions here are
+# plain Python; on a board whose firmware has the native emitter the viper
+# versions in kernels_native.py replace them at import time (copy both
+# files). Either way the output bytes are identical.
+
+def expand_glyph_py(bitmap, offset, dst, color, bg_color):
+    # 8x8 bitmap (8 bytes at offset) -> 128 bytes of RGB565 in dst
+    c_high, c_low = (color >> 8) & 0xFF, color & 0xFF
+    bg_high, bg_low = (bg_color >> 8) & 0xFF, bg_color & 0xFF
+    idx = 0
+    for row in range(8):
+        row_data = bitmap[offset + row]
+        for col in range(8):
+            if row_data & (0x80 >> col):
+                dst[idx] = c_high
+                dst[idx+1] = c_low
+            else:
+                dst[idx] = bg_high
+                dst[idx+1] = bg_low
+            idx += 2
+
+def expand_cells_py(dst, off, stride, cells, cols, size, y0, y1, color, bg_color):
+    # Pixel lines y0..y1-1 of an on/off grid scaled by size, written to dst
+    # from off, stride bytes apart. Repeated lines are copied, not rebuilt
+    c_high, c_low = (color >> 8) & 0xFF, color & 0xFF
+    bg_high, bg_low = (bg_color >> 8) & 0xFF, bg_color & 0xFF
+    on = bytes((c_high, c_low)) * size
+    off_px = bytes((bg_high, bg_low)) * size
+    n = size * 2
+    line = cols * n
+    prev = -1
+    for y in range(y0, y1):
+        if y % size and prev >= 0:
+            dst[off:off + line] = dst[prev:prev + line]
+        else:
+            base = (y // size) * cols
+            idx = off
+            for c in range(cols):
+                dst[idx:idx + n] = on if cells[base + c] else off_px
+                idx += n
+        prev = off
+        off += stride
+
+def copy_rows_py(dst, off, stride, src, src_off, src_stride, n, rows):
+    # rows runs of n bytes from src (src_stride apart; 0 repeats one run)
+    # into dst from off, stride bytes apart
+    for _ in range(rows):
+        dst[off:off + n] = src[src_off:src_off + n]
+        off += stride
+        src_off += src_stride
+
+expand_glyph = expand_glyph_py
+expand_cells = expand_cells_py
+copy_rows = copy_rows_py
+NATIVE = False
+
+try:
+    from kernels_native import expand_glyph, expand_cells, copy_rows
+    NATIVE = True
+except (ImportError, SyntaxError):
+    # CPython, or firmware built without the native emitter
+    pass
@@ -0,0 +1,125 @@
+# Save as 'kernels_native.py'
+# Viper builds of the loops in kernels.py, same arguments and output.
+# MicroPython only: kernels.py falls back to its own versions without it.
+# Viper functions take at most four arguments, so the numbers go in through
+# a preallocated int array.
+import micropython
+from array import array
+
+_args = array('i', [0] * 8)
+
+@micropython.viper
+def _glyph(bitmap, dst, args):
+    a = ptr32(args)
+    offset = a[0]
+    color = a[1]
+    bg_color = a[2]
+    src = ptr8(bitmap)
+    out = ptr8(dst)
+    c_high = (color >> 8) & 0xFF
+    c_low = color & 0xFF
+    bg_high = (bg_color >> 8) & 0xFF
+    bg_low = bg_color & 0xFF
+    idx = 0
+    for row in range(8):
+        row_data = src[offset + row]
+        mask = 0x80
+        while mask:
+            if row_data & mask:
+                out[idx] = c_high
+                out[idx+1] = c_low
+            else:
+                out[idx] = bg_high
+                out[idx+1] = bg_low
+            idx += 2
+            mask >>= 1
+
+@micropython.viper
+def _cells(dst, cells, args):
+    a = ptr32(args)
+    off = a[0]
+    stride = a[1]
+    cols = a[2]
+    size = a[3]
+    y0 = a[4]
+    y1 = a[5]
+    color = a[6]
+    bg_color = a[7]
+    out = ptr8(dst)
+    grid = ptr8(cells)
+    c_high = (color >> 8) & 0xFF
+    c_low = color & 0xFF
+    bg_high = (bg_color >> 8) & 0xFF
+    bg_low = bg_color & 0xFF
+    # Which cell row y0 falls in, without a division (viper on some ports
+    # has none): rep counts lines into the current cell row
+    base = 0
+    rep = y0
+    while rep >= size:
+        rep -= size
+        base += cols
+    y = y0
+    while y < y1:
+        idx = off
+        for c in range(cols):
+            hi = bg_high
+            lo = bg_low
+            if grid[base + c]:
+                hi = c_high
+                lo = c_low
+            for _ in range(size):
+                out[idx] = hi
+                out[idx+1] = lo
+                idx += 2
+        off += stride
+        y += 1
+        rep += 1
+        if rep == size:
+            rep = 0
+            base += cols
+
+@micropython.viper
+def _copy(dst, src, args):
+    a = ptr32(args)
+    off = a[0]
+    stride = a[1]
+    src_off = a[2]
+    src_stride = a[3]
+    n = a[4]
+    rows = a[5]
+    out = ptr8(dst)
+    inp = ptr8(src)
+    for _ in range(rows):
+        for i in range(n):
+            out[off + i] = inp[src_off + i]
+        off += stride
+        src_off += src_stride
+
+def expand_glyph(bitmap, offset, dst, color, bg_color):
+    a = _args
+    a[0] = offset
+    a[1] = color
+    a[2] = bg_color
+    _glyph(bitmap, dst, a)
+
+def expand_cells(dst, off, stride, cells, cols, size, y0, y1, color, bg_color):
+    a = _args
+    a[0] = off
+    a[1] = stride
+    a[2] = cols
+    a[3] = size
+    a[4] = y0
+    a[5] = y1
+    a[6] = color
+    a[7] = bg_color
+    _cells(dst, cells, a)
+
+def copy_rows(dst, off, stride, src, src_off, src_stride, n, rows):
+    a = _args
+    a[0] = off
+    a[1] = stride
+    a[2] = src_off
+    a[3] = src_stride
+    a[4] = n
+    a[5] = rows
+    _copy(dst, src, a)
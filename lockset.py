@@ -0,0 +1,79 @@
+# Save as 'lockset.py'
+# Owned/picked state as one bitset per belt, indexed by the number in the
+# lock id ("red_6" -> bit 6 of the "red" set). That number is the lock's
+# place in its belt; compile_catalog() refuses a locks.json that would move
+# it, so a bit always means the same lock. Membership and counts (total and
+# per belt) are O(1).
+import binascii
+
+POPCOUNT = bytes(bin(i).count("1") for i in range(256))
+
+def split_id(lock_id):
+    belt, n = lock_id.rsplit("_", 1)
+    return belt, int(n)
+
+class LockSet:
+    def __init__(self):
+        self.belts = {}
+        self.counts = {}
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def __contains__(self, lock_id):
+        belt, n = split_id(lock_id)
+        bits = self.belts.get(belt)
+        if bits is None or (n >> 3) >= len(bits): return False
+        return bool(bits[n >> 3] & (1 << (n & 7)))
+
+    def add(self, lock_id):
+        if lock_id in self: return False
+        belt, n = split_id(lock_id)
+        bits = self.belts.get(belt)
+        if bits is None or (n >> 3) >= len(bits):
+            grown = bytearray((n >> 3) + 1)
+            if bits: grown[:len(bits)] = bits
+            bits = self.belts[belt] = grown
+        bits[n >> 3] |= 1 << (n & 7)
+        self.counts[belt] = self.counts.get(belt, 0) + 1
+        self.total += 1
+        return True
+
+    def discard(self, lock_id):
+        if lock_id not in self: return False
+        belt, n = split_id(lock_id)
+        self.belts[belt][n >> 3] &= ~(1 << (n & 7)) & 0xFF
+        self.counts[belt] -= 1
+        self.total -= 1
+        return True
+
+    def toggle(self, lock_id):
+        if not self.discard(lock_id): self.add(lock_id)
+
+    def count_belt(self, belt):
+        return self.counts.get(belt, 0)
+
+    def members(self, belt):
+        # Lock numbers set in one belt, ascending
+        bits = self.belts.get(belt)
+        if not bits: return
+        for i in range(len(bits)):
+            b = bits[i]
+            if not b: continue
+            for j in range(8):
+                if b & (1 << j): yield (i << 3) | j
+
+    def dump(self):
+        # JSON friendly: {"red": "0440..."} (hex, bit n = lock n)
+        return {belt: binascii.hexlify(bits).decode() for belt, bits in self.belts.items() if any(bits)}
+
+    @classmethod
+    def load(cls, data):
+        s = cls()
+        for belt, hex_bits in data.items():
+            bits = bytearray(binascii.unhexlify(hex_bits))
+            s.belts[belt] = bits
+            s.counts[belt] = sum(POPCOUNT[b] for b in bits)
+            s.total += s.counts[belt]
+        return s
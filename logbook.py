@@ -0,0 +1,285 @@
+# Save as 'logbook.py'
+# Per-lock pick logs, one shard file per lock under /sd/data/logs, so RAM use
+# does not depend on how many picks are logged.
+#
+# A shard is fixed size records of REC bytes (JSON padded with spaces, then
+# a newline): record 0 is {"n": lock name, "seq": last journal op in it,
+# "c": entry count}, then the entries, oldest first. Entry i (newest first)
+# of a shard holding count entries is record count - i, so a page is one
+# seek and one read. Records past the count are left over from an append
+# that was cut off and are ignored.
+#
+# Changes are applied to RAM first. New entries are kept on their own
+# until the next snapshot (see saver.py) appends them to the shard and
+# rewrites its header. Only a delete reads a lock whole, and its shard is
+# then rewritten. The seq in the header lets journal replay skip ops a
+# shard already holds.
+import os, json
+
+REC = 256
+
+def shard_hash(name):
+    # FNV-1a of the utf-8 name; collisions probe the next value
+    h = 0x811c9dc5
+    for b in name.encode():
+        h = ((h ^ b) * 0x01000193) & 0xffffffff
+    return h
+
+def fit(entry):
+    # Entries have to fit a record: the longest text is cut until they do
+    over = len(json.dumps(entry).encode()) - (REC - 1)
+    if over <= 0: return entry
+    entry = dict(entry)
+    while over > 0:
+        key = None
+        for k, v in entry.items():
+            if isinstance(v, str) and v and (key is None or len(v) > len(entry[key])): key = k
+        if key is None: raise ValueError("log record too long")
+        # Cut in proportion to its encoded size (escapes take several bytes)
+        v = entry[key]
+        size = len(json.dumps(v).encode()) - 2
+        entry[key] = v[:max(0, len(v) - (over * len(v) + size - 1) // size)]
+        over = len(json.dumps(entry).encode()) - (REC - 1)
+    return entry
+
+def pack(obj):
+    data = json.dumps(obj).encode()
+    if len(data) >= REC: raise ValueError("log record too long")
+    return data + b" " * (REC - 1 - len(data)) + b"\n"
+
+def snapshot_lines(path, offset):
+    # (name, entries) per line after the state line, where the previous
+    # save format kept the logs; read one lock at a time
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if not line: break
+            t = line.find(b"\t")
+            if t > 0: yield json.loads(line[:t].decode()), json.loads(line[t + 1:].decode())
+
+class Logbook:
+    def __init__(self, path=None):
+        self.path = path  # shard directory; None = nothing on the card
+        self.paths = {}   # lock name -> shard file
+        self.loaded = {}  # lock name -> all entries, newest first (deletes)
+        self.added = {}   # lock name -> entries not in its shard yet, newest first
+        self.dirty = {}   # changed lock name -> changes since the snapshot
+        self.flight = {}  # lock name -> (entries, seq) of an append being written
+        self.wiped = False
+
+    def open(self, path):
+        self.path = path
+        try: os.mkdir(path)
+        except OSError: pass
+
+    def _header(self, shard):
+        # (name, seq, entry count) of a shard file, or None if it does not exist
+        try:
+            with open(shard, "rb") as f:
+                head = json.loads(f.read(REC).decode())
+        except OSError:
+            # Power was lost while swapping in a rewrite: finish it, but
+            # only if the rewrite got as far as its real header
+            try:
+                with open(shard + ".tmp", "rb") as f:
+                    if json.loads(f.read(REC).decode())["seq"] < 0: return None
+                os.rename(shard + ".tmp", shard)
+            except (OSError, ValueError): return None
+            return self._header(shard)
+        count = head.get("c")
+        if count is None: count = os.stat(shard)[6] // REC - 1 # older shards
+        return head["n"], head["seq"], count
+
+    def _shard(self, name):
+        shard = self.paths.get(name)
+        if shard is not None: return shard
+        h = shard_hash(name)
+        while True:
+            shard = "{}/{:08x}".format(self.path, h)
+            head = self._header(shard)
+            if head is None or head[0] == name: break
+            h = (h + 1) & 0xffffffff
+        self.paths[name] = shard
+        return shard
+
+    def _stored(self, name):
+        # Entry count of the lock's shard, less an append whose header is out
+        # but that is not committed yet (those entries are still in added)
+        if self.path is None or self.wiped: return 0
+        head = self._header(self._shard(name))
+        if head is None: return 0
+        flight = self.flight.get(name)
+        if flight and head[1] == flight[1]: return head[2] - flight[0]
+        return head[2]
+
+    def read(self, name, start, count):
+        # Entries start..start+count-1 (newest first) straight from the shard
+        total = self._stored(name)
+        end = min(total, start + count)
+        if start >= end: return []
+        with open(self._shard(name), "rb") as f:
+            f.seek((1 + total - end) * REC)
+            data = f.read((end - start) * REC)
+        out = []
+        for pos in range(len(data) - REC, -1, -REC):
+            out.append(json.loads(data[pos:pos + REC].decode()))
+        return out
+
+    def count(self, name):
+        entries = self.loaded.get(name)
+        if entries is not None: return len(entries)
+        return len(self.added.get(name, ())) + self._stored(name)
+
+    def held(self, name, start, count):
+        # The part of page() that is in RAM: (entries, then start and count
+        # of the rest, for read())
+        entries = self.loaded.get(name)
+        if entries is not None: return entries[start:start + count], 0, 0
+        added = self.added.get(name, [])
+        out = added[start:start + count]
+        return out, max(0, start - len(added)), count - len(out)
+
+    def page(self, name, start, count):
+        # Newest first; only the visible window is read from the card
+        out, start, count = self.held(name, start, count)
+        if count: out += self.read(name, start, count)
+        return out
+
+    def copy(self, name):
+        return self.page(name, 0, self.count(name))
+
+    def names(self):
+        # Every lock with entries; walks the shard directory (export/migration)
+        out, skip = self.held_names()
+        return out + self.stored_names(skip)
+
+    def held_names(self):
+        # (locks with entries in RAM, every lock kept in RAM)
+        out = [n for n, entries in self.loaded.items() if entries]
+        out += [n for n in self.added if n not in self.loaded]
+        return out, set(self.loaded) | set(self.added)
+
+    def stored_names(self, skip):
+        # Locks with entries in a shard, other than those in skip
+        out = []
+        if self.path is None or self.wiped: return out
+        for fname in os.listdir(self.path):
+            if fname.endswith(".tmp"): continue
+            head = self._header("{}/{}".format(self.path, fname))
+            if head and head[0] not in skip:
+                self.paths[head[0]] = "{}/{}".format(self.path, fname)
+                if self._stored(head[0]): out.append(head[0])
+        return out
+
+    def _applies(self, name, seq):
+        # Replayed ops (seq given) the shard already holds are skipped
+        if seq is None or name in self.loaded or name in self.added: return True
+        if self.path is None or self.wiped: return True
+        head = self._header(self._shard(name))
+        return head is None or seq > head[1]
+
+    def _changed(self, name):
+        self.dirty[name] = self.dirty.get(name, 0) + 1
+
+    def add(self, name, entry, seq=None):
+        # Only the new entry is kept; the shard is not read
+        if not self._applies(name, seq): return
+        entries = self.loaded.get(name)
+        if entries is None: entries = self.added.setdefault(name, [])
+        entries.insert(0, fit(entry))
+        self._changed(name)
+
+    def pop(self, name, index, seq=None):
+        # Returns the removed entry, or None if the shard had already lost it
+        if not self._applies(name, seq): return None
+        entries = self.loaded.get(name)
+        if entries is None:
+            entries = self.loaded[name] = self.copy(name)
+            self.added.pop(name, None)
+        self._changed(name)
+        return entries.pop(index)
+
+    def clear(self):
+        # Factory reset: shards are deleted by the next snapshot, after it is
+        # swapped in
+        self.loaded = {}
+        self.added = {}
+        self.dirty = {}
+        self.wiped = True
+
+    def write_shard(self, name, entries, seq):
+        # entries newest first. Written aside with seq -1, which is only
+        # replaced once every entry is out, then swapped in
+        shard = self._shard(name)
+        with open(shard + ".tmp", "wb") as f:
+            f.write(pack({"n": name, "seq": -1, "c": 0}))
+            for i in range(len(entries) - 1, -1, -1):
+                f.write(pack(entries[i]))
+            f.seek(0)
+            f.write(pack({"n": name, "seq": seq, "c": len(entries)}))
+        try: os.remove(shard)
+        except OSError: pass
+        os.rename(shard + ".tmp", shard)
+
+    def append_shard(self, name, entries, seq):
+        # entries newest first, after the ones the shard already holds. The
+        # header goes last: until it is out, readers and replay go by the
+        # old count and seq
+        shard = self._shard(name)
+        head = self._header(shard)
+        if head is None:
+            self.write_shard(name, entries, seq)
+            return
+        with open(shard, "r+b") as f:
+            f.seek((1 + head[2]) * REC)
+            for i in range(len(entries) - 1, -1, -1):
+                f.write(pack(entries[i]))
+            f.seek(0)
+            f.write(pack({"n": name, "seq": seq, "c": head[2] + len(entries)}))
+
+    def import_logs(self, logs, seq):
+        # Older save files held every log inline: give each lock its shard
+        for name, entries in logs:
+            self.write_shard(name, [fit(e) for e in entries], seq)
+
+    # --- SNAPSHOTS ---
+    # plan() runs with the state lock held and copies what changed; write()
+    # appends to or rewrites those shards without the lock, before the
+    # journal is emptied (after it for a wipe); commit() runs with the lock
+    # held once the snapshot is swapped in.
+    def plan(self, seq):
+        changed = []
+        for name in self.dirty:
+            if name in self.loaded:
+                changed.append((name, list(self.loaded[name]), False))
+            else:
+                entries = list(self.added[name])
+                changed.append((name, entries, True))
+                self.flight[name] = (len(entries), seq)
+        return changed, dict(self.dirty), seq, self.wiped
+
+    def write(self, plan):
+        changed, _, seq, wiped = plan
+        if self.path is None: return
+        if wiped:
+            for fname in os.listdir(self.path):
+                os.remove("{}/{}".format(self.path, fname))
+            self.paths = {}
+        for name, entries, append in changed:
+            if append: self.append_shard(name, entries, seq)
+            else: self.write_shard(name, entries, seq)
+
+    def commit(self, plan):
+        if plan[3]: self.wiped = False
+        for name, n in plan[1].items():
+            flight = self.flight.pop(name, None)
+            if self.dirty.get(name) != n:
+                # Changed again while writing: stays in RAM, less the
+                # entries that were just appended (the oldest ones)
+                added = self.added.get(name)
+                if flight and added: del added[len(added) - flight[0]:]
+                continue
+            del self.dirty[name]
+            self.loaded.pop(name, None)
+            self.added.pop(name, None)
@@ -1,6 +1,20 @@
 import machine, time, os, json, random, gc
+try:
+    import asyncio
+except ImportError: # MicroPython before 1.21
+    import uasyncio as asyncio
 from ili9341 import Display, color565
-from xpt2046 import Touch
+from xpt2046 import Touch, Gestures, TAP, REPEAT, SWIPE_LEFT, SWIPE_RIGHT, DRAG, FLING
+from ui import View, HitMap
+from sprite import Sprite
+from fontfile import FontFile
+import sprites
+from lockset import LockSet
+from catalog import Catalog, compile_catalog, source_stamp
+from journal import Journal
+from saver import Saver
+from logbook import Logbook, snapshot_lines
+from exporter import export
 
 # --- 1. HARDWARE INIT ---
 try:
@@ -20,8 +34,16 @@ batt_adc.atten(machine.ADC.ATTN_11DB)
 
 spi = machine.SPI(1, baudrate=40000000, sck=machine.Pin(14), mosi=machine.Pin(13))
 display = Display(spi, dc=machine.Pin(2), cs=machine.Pin(15), rst=machine.Pin(12))
-touch_spi = machine.SoftSPI(baudrate=1000000, sck=machine.Pin(25), mosi=machine.Pin(32), miso=machine.Pin(39))
-touch = Touch(touch_spi, cs=machine.Pin(33))
+# Touch has its own pins, so it gets the second hardware SPI host. The batched
+# reads are fast enough to average 5 readings per point (tools/bench_touch.py).
+# Set TOUCH_HW_SPI = False to fall back to bit-banged SoftSPI
+TOUCH_HW_SPI = True
+if TOUCH_HW_SPI:
+    touch_spi = machine.SPI(2, baudrate=2000000, sck=machine.Pin(25), mosi=machine.Pin(32), miso=machine.Pin(39))
+    touch = Touch(touch_spi, cs=machine.Pin(33), int_pin=machine.Pin(36), samples=5, settle_ms=1)
+else:
+    touch_spi = machine.SoftSPI(baudrate=1000000, sck=machine.Pin(25), mosi=machine.Pin(32), miso=machine.Pin(39))
+    touch = Touch(touch_spi, cs=machine.Pin(33), int_pin=machine.Pin(36))
 
 # --- 2. CONFIG & COLORS ---
 BLACK = color565(0, 0, 0)
@@ -55,93 +77,241 @@ draft_log = {"y": 2026, "m": 1, "d": 1, "tool": 0, "p_size": 0, "t_size": 0, "st
 timer_running = False
 timer_start = 0
 timer_elapsed = 0
+timer_shown = None # Text currently on the big digits, for delta redraws
 
+# Each trophy is a threshold on one running stat (see achievement_stats):
+# "min" = unlocked at or above, "max" = unlocked below
 ACHIEVEMENTS = [
-    {"id": "beginner", "name": "Beginner", "desc": "1st Lock Picked"},
-    {"id": "novice", "name": "Novice", "desc": "10 Locks Picked"},
-    {"id": "expert", "name": "Expert", "desc": "50 Locks Picked"},
-    {"id": "collector", "name": "Collector", "desc": "Own 10 Locks"},
-    {"id": "hoarder", "name": "Hoarder", "desc": "Own 25 Locks"},
-    {"id": "speed", "name": "Speed Demon", "desc": "Pick in < 30s"},
-    {"id": "lightning", "name": "Lightning", "desc": "Pick in < 10s"},
-    {"id": "tech", "name": "Technician", "desc": "20 TOK Picks"},
-    {"id": "raker", "name": "Raker", "desc": "20 Rake Picks"},
-    {"id": "globe", "name": "Globetrotter", "desc": "Picks in 3 Belts"}
+    {"id": "beginner", "name": "Beginner", "desc": "1st Lock Picked", "stat": "picks", "min": 1},
+    {"id": "novice", "name": "Novice", "desc": "10 Locks Picked", "stat": "picks", "min": 10},
+    {"id": "expert", "name": "Expert", "desc": "50 Locks Picked", "stat": "picks", "min": 50},
+    {"id": "collector", "name": "Collector", "desc": "Own 10 Locks", "stat": "owned", "min": 10},
+    {"id": "hoarder", "name": "Hoarder", "desc": "Own 25 Locks", "stat": "owned", "min": 25},
+    {"id": "speed", "name": "Speed Demon", "desc": "Pick in < 30s", "stat": "fastest", "max": 30},
+    {"id": "lightning", "name": "Lightning", "desc": "Pick in < 10s", "stat": "fastest", "max": 10},
+    {"id": "tech", "name": "Technician", "desc": "20 TOK Picks", "stat": "tok", "min": 20},
+    {"id": "raker", "name": "Raker", "desc": "20 Rake Picks", "stat": "rake", "min": 20},
+    {"id": "globe", "name": "Globetrotter", "desc": "Picks in 3 Belts", "stat": "belts", "min": 3}
 ]
 
 # --- 4. DATA MANAGER ---
-db = {"locks": {}, "user": {"owned": [], "picked": [], "logs": {}, "trophies": [], "auto_dim": True, "show_batt": True}}
+def new_counters():
+    # Running totals behind the trophies, updated per log insert/delete.
+    # serial = highest log number handed out (see exporter.py)
+    return {"logs": 0, "tok": 0, "rake": 0, "fastest": None, "serial": 0}
+
+def new_stats():
+    # STATS rollups, updated per log insert/delete. Durations are histograms
+    # of seconds (keys are strings so they survive JSON)
+    return {"tools": {}, "durs": {}, "lock_durs": {}, "belts": {}, "months": {}}
+
+db = {"user": {"owned": LockSet(), "picked": LockSet(), "trophies": [], "counters": new_counters(), "stats": new_stats(), "auto_dim": True, "show_batt": True}}
+catalog = Catalog(None, BELT_ORDER)
+# Snapshot + append-only op log (see journal.py); pick logs live in one
+# shard file per lock (see logbook.py)
+journal = Journal("/sd/data/user_progress.json", "/sd/data/user_progress.log")
+logbook = Logbook()
+saver = Saver(journal, lambda: snapshot_user(), logbook)
+export_status = None   # (ok, message) set by the background export job
+export_progress = None # (locks done, locks) while an export runs
 current_belt = "Green"
-current_page = 0
-items_per_page = 8
+current_page = 0 # TROPHIES page
+list_scroll = 0  # px of LIST/COLLECTION scrolled out of view at the top
+list_velocity = 0 # px/s of a fling still running
 return_screen = "HOME"
+ui_font = None # proportional font for headers and lock names, if on the SD card
+
+def open_catalog(src, path):
+    # locks.bin, compiled again from locks.json (see catalog.py) when it is
+    # missing, damaged or was built from a different locks.json. A locks.json
+    # that would move lock ids is refused, and the old catalog kept
+    try: stamp = source_stamp(src)
+    except OSError: stamp = None # only locks.bin on the card
+    cat = None
+    try:
+        cat = Catalog(path, BELT_ORDER)
+        if stamp is None or cat.source == stamp: return cat
+    except (OSError, ValueError): pass
+    with open(src, "r") as f:
+        locks = json.load(f)
+    try:
+        if cat: cat.close()
+        compile_catalog(locks, path, stamp)
+    except ValueError as e:
+        if cat is None: raise
+        print("locks.json not used:", e)
+        return Catalog(path, BELT_ORDER)
+    del locks
+    gc.collect()
+    return Catalog(path, BELT_ORDER)
 
 def load_data():
-    global db
+    global db, catalog, ui_font
     try:
         sd = machine.SDCard(slot=2, width=1, cd=None, wp=None, sck=machine.Pin(18), miso=machine.Pin(19), mosi=machine.Pin(23), cs=machine.Pin(5))
         try: os.mount(sd, "/sd")
         except: pass
         
-        with open("/sd/data/locks.json", "r") as f:
-            db["locks"] = json.load(f)
-        try:
-            with open("/sd/data/user_progress.json", "r") as f:
-                db["user"] = json.load(f)
-                if "logs" not in db["user"]: db["user"]["logs"] = {}
-                if "trophies" not in db["user"]: db["user"]["trophies"] = []
-                if "auto_dim" not in db["user"]: db["user"]["auto_dim"] = True
-                if "show_batt" not in db["user"]: db["user"]["show_batt"] = True
-        except: save_data()
+        try: ui_font = FontFile("/sd/fonts/ui.fnt", budget=2048)
+        except OSError: pass # built-in 8x8 font
+        catalog = open_catalog("/sd/data/locks.json", "/sd/data/locks.bin")
+        logbook.open("/sd/data/logs")
+        saved = journal.load_snapshot()
+        if saved is None:
+            save_data()
+            return
+        logs = saved.pop("logs", None)
+        if saved.pop("logs_wiped", False): logbook.clear() # see snapshot_user()
+        db["user"] = saved
+        legacy = isinstance(db["user"].get("owned"), list)
+        db["user"]["owned"] = load_lockset(db["user"].get("owned", {}))
+        db["user"]["picked"] = load_lockset(db["user"].get("picked", {}))
+        if "trophies" not in db["user"]: db["user"]["trophies"] = []
+        if "auto_dim" not in db["user"]: db["user"]["auto_dim"] = True
+        if "show_batt" not in db["user"]: db["user"]["show_batt"] = True
+        if "counters" not in db["user"] or "stats" not in db["user"]:
+            rebuild_counters(logs or {}); legacy = True
+        # Older files kept the logs in the snapshot: move them to shards
+        if logs is not None:
+            logbook.import_logs(logs.items(), journal.seq); legacy = True
+        elif journal.body_offset < os.stat(journal.snapshot_path)[6]:
+            logbook.import_logs(snapshot_lines(journal.snapshot_path, journal.body_offset), journal.seq); legacy = True
+        logs = None
+        journal.replay(apply_op)
+        if legacy or logbook.wiped or journal.needs_compact(): save_data()
     except Exception as e: print("SD Error:", e)
 
+def load_lockset(saved):
+    if isinstance(saved, dict): return LockSet.load(saved)
+    # Old files stored lock names: mark every lock carrying that name
+    names = set(saved)
+    s = LockSet()
+    for lock in catalog.iter_locks():
+        if lock['n'] in names: s.add(lock['id'])
+    return s
+
+def snapshot_user():
+    user = dict(db["user"])
+    user["owned"] = user["owned"].dump()
+    user["picked"] = user["picked"].dump()
+    # Shards of a factory reset are deleted after this snapshot is in
+    # place: if that is cut short, load_data() deletes them again
+    if logbook.wiped: user["logs_wiped"] = True
+    return user
+
 def save_data():
+    # Full snapshot; folds in (and empties) the op log. Waits for the card
     try:
-        with open("/sd/data/user_progress.json", "w") as f:
-            json.dump(db["user"], f)
+        saver.request_compact()
+        saver.flush()
     except: pass
 
+def apply_op(op):
+    # The only place user state changes; also used to replay the op log
+    kind = op["op"]
+    if kind == "toggle":
+        db["user"][op["list"]].toggle(op["id"])
+    elif kind == "remove":
+        db["user"]["owned"].discard(op["id"])
+        db["user"]["picked"].discard(op["id"])
+    elif kind == "log":
+        logbook.add(op["lock"], op["entry"], op.get("seq"))
+        c = db["user"]["counters"]
+        c["serial"] = max(c.get("serial", 0), op["entry"].get("no", 0))
+        count_log(op["lock"], op["entry"], 1)
+    elif kind == "unlog":
+        # Replayed ops a shard already holds still count; the op has the entry
+        entry = logbook.pop(op["lock"], op["index"], op.get("seq"))
+        count_log(op["lock"], entry if entry is not None else op["entry"], -1)
+    elif kind == "set":
+        db["user"][op["key"]] = op["value"]
+    elif kind == "trophy":
+        if op["id"] not in db["user"]["trophies"]: db["user"]["trophies"].append(op["id"])
+
+def record(op):
+    # Apply a change now; the saver appends it to the op log in the background
+    saver.record(op, apply_op)
+
+def lock_logs(lock_name, start, count):
+    # Entries start..start+count-1 of the lock, newest first, and the total
+    with saver.lock:
+        return logbook.page(lock_name, start, count), logbook.count(lock_name)
+
 def perform_factory_reset():
-    db["user"] = {"owned": [], "picked": [], "logs": {}, "trophies": [], "auto_dim": True, "show_batt": True}
-    save_data()
+    with saver.lock:
+        saver.pending = []
+        logbook.clear()
+        db["user"] = {"owned": LockSet(), "picked": LockSet(), "trophies": [], "counters": new_counters(), "stats": new_stats(), "auto_dim": True, "show_batt": True}
+    save_data() # Waits for the empty snapshot and the shards to be deleted
+
+def parse_dur(dur):
+    # "MM:SS" -> seconds
+    parts = dur.split(':')
+    return (int(parts[0]) * 60) + int(parts[1])
+
+def is_rake(tool):
+    t_name = tool.lower()
+    return "rake" in t_name or "bogota" in t_name or "city" in t_name
+
+def bump(d, key, sign):
+    v = d.get(key, 0) + sign
+    if v > 0: d[key] = v
+    else: d.pop(key, None)
+
+def count_log(lock_name, entry, sign):
+    c = db["user"]["counters"]
+    c["logs"] += sign
+    if entry.get('style') == "TOK": c["tok"] += sign
+    if is_rake(entry.get('tool', '')): c["rake"] += sign
+    # Fastest is a personal best: deleting the log does not undo it
+    if sign > 0 and entry.get('dur'):
+        sec = parse_dur(entry['dur'])
+        if c["fastest"] is None or sec < c["fastest"]: c["fastest"] = sec
+
+    st = db["user"]["stats"]
+    bump(st["tools"], entry.get('tool', 'Unknown'), sign)
+    bump(st["months"], entry['date'][:7], sign)
+    if entry.get('id'): bump(st["belts"], catalog.belt_of(entry['id']), sign)
+    if entry.get('dur'):
+        sec = str(parse_dur(entry['dur']))
+        bump(st["durs"], sec, sign)
+        lock_durs = st["lock_durs"].setdefault(lock_name, {})
+        bump(lock_durs, sec, sign)
+        if not lock_durs: del st["lock_durs"][lock_name]
+
+def rebuild_counters(logs):
+    # Only needed when migrating files saved before counters/stats existed,
+    # which still held every log inline
+    db["user"]["counters"] = new_counters()
+    db["user"]["stats"] = new_stats()
+    ids = {}
+    for lock in catalog.iter_locks():
+        if lock['n'] not in ids: ids[lock['n']] = lock['id']
+    for lock_name, entries in logs.items():
+        for log in entries:
+            # Older entries predate the lock id field
+            if 'id' not in log and lock_name in ids: log['id'] = ids[lock_name]
+            count_log(lock_name, log, 1)
+
+def achievement_stats():
+    c = db["user"]["counters"]
+    return {
+        "picks": max(c["logs"], len(db["user"]["picked"])),
+        "owned": len(db["user"]["owned"]),
+        "fastest": c["fastest"],
+        "tok": c["tok"], "rake": c["rake"],
+        "belts": catalog.belts_covered(db["user"]["picked"]),
+    }
 
 def check_achievements():
-    changed = False
-    total_logs = sum(len(v) for v in db["user"]["logs"].values())
-    total_owned = len(db["user"]["owned"])
-    total_picked_status = len(db["user"]["picked"])
-    
-    if (total_logs >= 1 or total_picked_status >= 1) and "beginner" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("beginner"); changed = True
-    if (total_logs >= 10 or total_picked_status >= 10) and "novice" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("novice"); changed = True
-    if (total_logs >= 50 or total_picked_status >= 50) and "expert" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("expert"); changed = True
-    if total_owned >= 10 and "collector" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("collector"); changed = True
-    if total_owned >= 25 and "hoarder" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("hoarder"); changed = True
-
-    belts_picked = set()
-    for belt in BELT_ORDER:
-        belt_locks = [l['n'] for l in db["locks"].get(belt, [])]
-        picked_in_belt = any(l in db["user"]["picked"] for l in belt_locks)
-        if picked_in_belt: belts_picked.add(belt)
-    if len(belts_picked) >= 3 and "globe" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("globe"); changed = True
-
-    tok_count = 0; rake_count = 0
-    for lock_logs in db["user"]["logs"].values():
-        for log in lock_logs:
-            if log.get('style') == "TOK": tok_count += 1
-            t_name = log.get('tool', '').lower()
-            if "rake" in t_name or "bogota" in t_name or "city" in t_name: rake_count += 1
-    if tok_count >= 20 and "tech" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("tech"); changed = True
-    if rake_count >= 20 and "raker" not in db["user"]["trophies"]:
-        db["user"]["trophies"].append("raker"); changed = True
-
-    if changed: save_data()
+    stats = achievement_stats()
+    trophies = db["user"]["trophies"]
+    for a in ACHIEVEMENTS:
+        if a["id"] in trophies: continue
+        v = stats[a["stat"]]
+        if v is None: continue
+        if ("min" in a and v >= a["min"]) or ("max" in a and v < a["max"]):
+            record({"op": "trophy", "id": a["id"]})
 
 # --- UTILITIES ---
 def get_battery_pct():
@@ -153,80 +323,99 @@ def get_battery_pct():
         return pct
     except: return 0
 
-def export_csv():
+def export_read(lock_name, start, count):
+    # On the saver thread shards do not change, so only the entries in RAM
+    # are taken with the lock held; the card is read without it
+    with saver.lock:
+        out, start, count = logbook.held(lock_name, start, count)
+    if count: out += logbook.read(lock_name, start, count)
+    return out
+
+def export_step(done, total):
+    global export_progress
+    export_progress = (done, total)
+
+def export_job(fmt, incremental):
+    # Runs on the saver thread; the UI loop draws export_progress
+    global export_status
+    marks = db["user"].get("export_marks", {})
+    with saver.lock:
+        names, held = logbook.held_names()
     try:
-        with open("/sd/data/locks_export.csv", "w") as f:
-            f.write("Lock Name,Date,Time,Tool,Pick Size,Tension,Rating\n")
-            for lock_name, entries in db["user"]["logs"].items():
-                for e in entries:
-                    f.write("{},{},{},{},{},{},{}\n".format(
-                        lock_name, e['date'], e.get('dur',''), e.get('tool',''),
-                        e.get('p_size',''), e.get('tension',''), e.get('rating','')))
-        return True
-    except: return False
-
-def toggle_status(lock_name, list_type):
-    if lock_name in db["user"][list_type]: db["user"][list_type].remove(lock_name)
-    else: db["user"][list_type].append(lock_name)
-    save_data(); check_achievements()
-
-def full_remove_lock(lock_name):
-    changed = False
-    if lock_name in db["user"]["owned"]: db["user"]["owned"].remove(lock_name); changed = True
-    if lock_name in db["user"]["picked"]: db["user"]["picked"].remove(lock_name); changed = True
-    if changed: save_data()
-
-def add_log_entry(lock_name):
-    if lock_name not in db["user"]["logs"]: db["user"]["logs"][lock_name] = []
+        names += logbook.stored_names(held)
+        since = marks.get(fmt) if incremental else None
+        path, rows, mark = export("/sd/data/locks_export", fmt, names, export_read, since, export_step)
+        if mark != marks.get(fmt):
+            marks = dict(marks)
+            marks[fmt] = mark
+            set_option("export_marks", marks)
+        export_status = (True, ("{} NEW ROWS SAVED" if incremental else "{} ROWS SAVED").format(rows))
+    except Exception as e:
+        print("Export Error:", e)
+        export_status = (False, "SD ERROR {}".format(e.args[0] if e.args else ""))
+
+def toggle_status(lock_id, list_type):
+    record({"op": "toggle", "list": list_type, "id": lock_id})
+    check_achievements()
+
+def full_remove_lock(lock_id):
+    if lock_id in db["user"]["owned"] or lock_id in db["user"]["picked"]:
+        record({"op": "remove", "id": lock_id})
+
+def set_option(key, value):
+    record({"op": "set", "key": key, "value": value})
+
+def add_log_entry(lock):
     d_str = "{}-{:02d}-{:02d}".format(draft_log['y'], draft_log['m'], draft_log['d'])
     entry = {
         "date": d_str, "tool": OPT_TOOLS[draft_log['tool']],
         "p_size": OPT_PICK_SIZE[draft_log['p_size']], "t_size": OPT_TEN_SIZE[draft_log['t_size']],
         "style": OPT_STYLE[draft_log['style']], "tension": OPT_TENSION[draft_log['tension']],
-        "dur": draft_log['dur'], "rating": draft_log['rating']
+        "dur": draft_log['dur'], "rating": draft_log['rating'], "id": lock['id'],
+        "no": db["user"]["counters"].get("serial", 0) + 1
     }
-    db["user"]["logs"][lock_name].insert(0, entry)
-    if draft_log['dur']:
-        parts = draft_log['dur'].split(':')
-        sec = (int(parts[0]) * 60) + int(parts[1])
-        if sec < 30 and "speed" not in db["user"]["trophies"]: db["user"]["trophies"].append("speed")
-        if sec < 10 and "lightning" not in db["user"]["trophies"]: db["user"]["trophies"].append("lightning")
-    save_data(); check_achievements()
+    record({"op": "log", "lock": lock['n'], "entry": entry})
+    check_achievements()
 
 def delete_log_entry(lock_name, index):
-    if lock_name in db["user"]["logs"]:
-        if index < len(db["user"]["logs"][lock_name]):
-            del db["user"]["logs"][lock_name][index]
-            save_data()
+    entries, _ = lock_logs(lock_name, index, 1)
+    if entries:
+        record({"op": "unlog", "lock": lock_name, "index": index, "entry": entries[0]})
 
-def get_owned_locks():
-    collection = []
-    seen = [] 
-    for belt in BELT_ORDER:
-        for lock in db["locks"].get(belt, []):
-            if lock['n'] in db["user"]["owned"] and lock['n'] not in seen:
-                lock['_belt'] = belt
-                collection.append(lock); seen.append(lock['n'])
-    return collection
+def get_owned_ids():
+    return catalog.collection(db["user"]["owned"])
 
 def get_user_rank():
-    for belt in reversed(BELT_ORDER):
-        for lock in db["locks"].get(belt, []):
-            if lock['n'] in db["user"]["picked"]: return belt
-    return "White"
+    return catalog.rank(db["user"]["picked"])
+
+def dur_summary(durs):
+    # (fastest, median) seconds from a {"sec": count} histogram, or (None, None)
+    if not durs: return None, None
+    secs = sorted(int(k) for k in durs)
+    total = sum(durs.values())
+    lo_idx, hi_idx = (total - 1) // 2, total // 2
+    seen = 0; lo = None
+    for sec in secs:
+        seen += durs[str(sec)]
+        if lo is None and seen > lo_idx: lo = sec
+        if seen > hi_idx: return secs[0], (lo + sec) // 2
+
+def fmt_sec(sec):
+    return format_time(sec * 1000) if sec is not None else "--:--"
 
 def calc_stats():
-    total_logs = sum(len(v) for v in db["user"]["logs"].values())
-    fastest = None
-    tools = {}
-    for lock, entries in db["user"]["logs"].items():
-        for entry in entries:
-            t = entry.get('tool', 'Unknown')
-            tools[t] = tools.get(t, 0) + 1
-            if 'dur' in entry and entry['dur']:
-                if fastest is None or entry['dur'] < fastest: fastest = entry['dur']
+    st = db["user"]["stats"]
+    total_logs = db["user"]["counters"]["logs"]
+    tools = st["tools"]
     fav_tool = max(tools, key=tools.get) if tools else "None"
-    return total_logs, fav_tool, (fastest if fastest else "--:--")
+    fastest, median = dur_summary(st["durs"])
+    belts, months = st["belts"], st["months"]
+    top_belt = max(belts, key=belts.get) if belts else None
+    top_month = max(months, key=months.get) if months else None
+    return total_logs, fav_tool, fastest, median, top_belt, top_month
+
+def lock_stats(lock_name):
+    return dur_summary(db["user"]["stats"]["lock_durs"].get(lock_name))
 
 def draw_btn(x, y, w, h, text, color, text_color=WHITE):
     display.fill_rectangle(x, y, w, h, color)
@@ -234,14 +423,28 @@ def draw_btn(x, y, w, h, text, color, text_color=WHITE):
     t_y = y + (h // 2) - 4
     display.draw_text(text, t_x, t_y, text_color, color)
 
+def draw_split_btn(x, y, w, text):
+    draw_btn(x, y, w, 30, text, GREY)
+    display.fill_rectangle(x + (w // 2), y+2, 1, 26, BLACK)
+
+def button(x, y, w, h, text, color, text_color, fn, *args):
+    # draw_btn that is also a tap target of the screen being drawn
+    draw_btn(x, y, w, h, text, color, text_color)
+    hits.add(x, y, w, h, fn, *args)
+
+def draw_fitted(text, x, y, h, px, color, bg_color):
+    # text cut to px pixels wide, centred in lines y..y+h-1, in ui_font
+    font_h = ui_font.height if ui_font else 8
+    display.draw_text(display.fit_text(text, px, ui_font), x, y + (h - font_h) // 2, color, bg_color, ui_font)
+
 def draw_header(text, bg_color=GREY, text_color=WHITE):
     display.fill_rectangle(0, 0, 240, 35, bg_color)
-    display.draw_text(text, 10, 10, text_color, bg_color)
-    draw_btn(180, 5, 55, 25, "MENU", LIGHT_GREY, WHITE)
+    draw_fitted(text, 10, 2, 24, 165, text_color, bg_color)
+    button(180, 5, 55, 25, "MENU", LIGHT_GREY, WHITE, go_home)
 
 def draw_battery_icon():
     if not db["user"].get("show_batt", True): return
-    pct = get_battery_pct()
+    pct = battery_pct # sampled by battery_task
     c = GREEN
     if pct < 20: c = RED
     elif pct < 50: c = ORANGE
@@ -259,97 +462,155 @@ def adjust_val(val, delta, min_v, max_v):
     if new_v < min_v: return max_v
     return new_v
 
-def adjust_idx(idx, delta, length):
-    return (idx + delta) % length
-
 def format_time(ms):
     seconds = int(ms / 1000)
     return "{:02d}:{:02d}".format((seconds // 60) % 60, seconds % 60)
 
-DIGIT_MAP = {'0':[1,1,1,1,0,1,1,0,1,1,0,1,1,1,1],'1':[0,1,0,0,1,0,0,1,0,0,1,0,0,1,0],'2':[1,1,1,0,0,1,1,1,1,1,0,0,1,1,1],'3':[1,1,1,0,0,1,0,1,1,0,0,1,1,1,1],'4':[1,0,1,1,0,1,1,1,1,0,0,1,0,0,1],'5':[1,1,1,1,0,0,1,1,1,0,0,1,1,1,1],'6':[1,1,1,1,0,0,1,1,1,1,0,1,1,1,1],'7':[1,1,1,0,0,1,0,0,1,0,0,1,0,0,1],'8':[1,1,1,1,0,1,1,1,1,1,0,1,1,1,1],'9':[1,1,1,1,0,1,1,1,1,0,0,1,1,1,1],':':[0,0,0,0,1,0,0,0,0,0,1,0,0,0,0]}
-SKULL_ICON = [0,0,1,1,1,1,1,1,0,0,0,1,1,1,1,1,1,1,1,0,1,1,1,1,1,1,1,1,1,1,1,1,1,0,0,1,0,0,1,1,1,1,1,0,0,1,0,0,1,1,1,1,1,1,1,0,1,1,1,1,0,1,1,1,1,1,1,1,1,0,0,0,1,0,1,0,1,0,1,0,0,0,1,1,1,1,1,1,1,0]
+def format_time_tenths(ms):
+    return "{}.{}".format(format_time(ms), (ms // 100) % 10)
+
+DIGIT_MAP = {'0':bytes([1,1,1,1,0,1,1,0,1,1,0,1,1,1,1]),'1':bytes([0,1,0,0,1,0,0,1,0,0,1,0,0,1,0]),'2':bytes([1,1,1,0,0,1,1,1,1,1,0,0,1,1,1]),'3':bytes([1,1,1,0,0,1,0,1,1,0,0,1,1,1,1]),'4':bytes([1,0,1,1,0,1,1,1,1,0,0,1,0,0,1]),'5':bytes([1,1,1,1,0,0,1,1,1,0,0,1,1,1,1]),'6':bytes([1,1,1,1,0,0,1,1,1,1,0,1,1,1,1]),'7':bytes([1,1,1,0,0,1,0,0,1,0,0,1,0,0,1]),'8':bytes([1,1,1,1,0,1,1,1,1,1,0,1,1,1,1]),'9':bytes([1,1,1,1,0,1,1,1,1,0,0,1,1,1,1]),':':bytes([0,0,0,0,1,0,0,0,0,0,1,0,0,0,0]),'.':bytes([0,0,0,0,0,0,0,0,0,0,0,0,0,1,0])}
 
 def draw_big_char(x, y, char, color, bg_color, size=10):
     grid = DIGIT_MAP.get(char, DIGIT_MAP[':'])
-    for r in range(5):
-        for c in range(3):
-            fill = color if grid[r*3 + c] else bg_color
-            display.fill_rectangle(x + (c * size), y + (r * size), size, size, fill)
+    display.blit_cells(x, y, 3, 5, grid, size, color, bg_color)
 
-def draw_big_time(x, y, text, color, bg_color, size=10):
+def draw_big_time(x, y, text, color, bg_color, size=10, prev=None):
+    # Only redraw characters that differ from prev (what is already shown)
     cursor_x = x
-    for char in text:
-        draw_big_char(cursor_x, y, char, color, bg_color, size)
+    for i, char in enumerate(text):
+        if prev is None or i >= len(prev) or prev[i] != char:
+            draw_big_char(cursor_x, y, char, color, bg_color, size)
         cursor_x += (4 * size)
+    return text
+
+# Stopwatch digits: "MM:SS.t" at size 7 fits the 200px panel
+TIMER_X, TIMER_Y, TIMER_SIZE = 25, 72, 7
+
+def draw_timer(ms):
+    global timer_shown
+    timer_shown = draw_big_time(TIMER_X, TIMER_Y, format_time_tenths(ms), WHITE, GREY, TIMER_SIZE, timer_shown)
+
+SKULL = Sprite(sprites.SKULL)
+BELT = Sprite(sprites.BELT)     # drawn in white, which becomes the rank's color
+TROPHY = Sprite(sprites.TROPHY)
+
+# bg is the color under the sprite: without a frame (COMPOSITE off) its
+# transparent pixels would come out black
+def draw_skull_icon(cx, cy, size=10, bg=WHITE):
+    display.blit_sprite(SKULL, cx - (5 * size), cy - (4 * size), size, bg=bg)
 
-def draw_skull_icon(cx, cy, color, size=10):
-    start_x = cx - (5 * size)
-    start_y = cy - (4 * size)
-    for r in range(9):
-        for c in range(10):
-            if SKULL_ICON[r*10 + c] == 1:
-                display.fill_rectangle(start_x + (c*size), start_y + (r*size), size, size, color)
-
-def draw_belt_graphic(cx, cy, color):
-    oc = BLACK 
-    def rect(x, y, w, h, c):
-        display.fill_rectangle(x, y, w, h, oc) 
-        display.fill_rectangle(x+2, y+2, w-4, h-4, c) 
-    rect(cx - 35, cy + 10, 25, 50, color)
-    rect(cx + 10, cy + 10, 25, 50, color)
-    rect(cx - 60, cy - 15, 120, 30, color)
-    rect(cx - 20, cy - 20, 40, 40, color)
-    display.fill_rectangle(cx - 20, cy, 40, 2, oc)
+def draw_belt_graphic(cx, cy, color, bg=BLACK):
+    colors = [color if c == WHITE else c for c in BELT.palette]
+    display.blit_sprite(BELT, cx - 60, cy - 20, colors=colors, bg=bg)
 
 # --- 7. SCREENS ---
 active_screen = "SPLASH"
 selected_lock = None
-
+history_page = 0 # HISTORY shows HISTORY_ROWS entries per page
+HISTORY_ROWS = 4
+view = View() # Retained widgets of the active screen
+hits = HitMap() # Tap targets of the active screen, added as it is drawn
+
+# Screen name -> draw function. Drawing a screen makes it the active one and
+# starts its tap targets afresh, so go(name) is all a transition needs.
+SCREENS = {}
+shown = None # (draw, args) of the screen on display, for redraw()
+
+def route(name):
+    def wrap(fn):
+        def draw(*args):
+            global active_screen, shown, list_velocity
+            active_screen = name
+            shown = (draw, args)
+            hits.clear()
+            list_velocity = 0
+            display.reset_scroll() # only the lists scroll
+            fn(*args)
+        SCREENS[name] = draw
+        return draw
+    return wrap
+
+def go(name, *args):
+    SCREENS[name](*args)
+
+def redraw():
+    shown[0](*shown[1])
+
+# Full screens are composited off-screen and pushed in strips (no flicker)
+COMPOSITE = True
+
+def composited(fn):
+    if not COMPOSITE: return fn
+    def screen(*args):
+        display.begin_frame()
+        try: fn(*args)
+        finally: display.end_frame()
+    return screen
+
+@route("SPLASH")
+@composited
 def screen_splash():
     display.fill_rectangle(0, 0, 240, 320, WHITE)
-    draw_skull_icon(120, 140, BLACK, size=15)
+    draw_skull_icon(120, 140, size=15, bg=WHITE)
     display.draw_text("W5A", 108, 220, BLACK, WHITE)
     free_ram = gc.mem_free() // 1024
     display.draw_text("RAM: {} KB".format(free_ram), 80, 250, GREY, WHITE)
     display.draw_text("touch anywhere", 65, 280, BLACK, WHITE)
+    hits.add(0, 0, 240, 320, go, "HOME")
 
+@route("HOME")
+@composited
 def screen_home():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     display.fill_rectangle(0, 0, 240, 50, GREY)
-    
+
     rank = get_user_rank()
     rank_color = BELT_COLORS.get(rank, WHITE)
     t_color = BLACK if rank in ["White", "Yellow", "Orange"] else WHITE
-    draw_btn(0, 0, 240, 60, "Locksport Dojo", rank_color, t_color)
+    button(0, 0, 240, 60, "Locksport Dojo", rank_color, t_color, go, "MY_BELT")
     draw_battery_icon()
-    
-    draw_btn(10, 70, 105, 60, "LIBRARY", BLUE)
-    draw_btn(125, 70, 105, 60, "COLLECTION", GOLD, BLACK)
-    draw_btn(10, 140, 105, 60, "TRAINING", ORANGE, BLACK)
-    draw_btn(125, 140, 105, 60, "STATS", PURPLE)
-    
+
+    button(10, 70, 105, 60, "LIBRARY", BLUE, WHITE, go, "BELTS")
+    button(125, 70, 105, 60, "COLLECTION", GOLD, BLACK, open_paged, "COLLECTION")
+    button(10, 140, 105, 60, "TRAINING", ORANGE, BLACK, go, "ROULETTE")
+    button(125, 140, 105, 60, "STATS", PURPLE, WHITE, go, "STATS")
+
     owned = len(db["user"]["owned"])
     picked = len(db["user"]["picked"])
     display.draw_text("Owned: {}".format(owned), 20, 220, BLUE, BLACK)
     display.draw_text("Picked: {}".format(picked), 140, 220, GREEN, BLACK)
-    
-    draw_btn(20, 260, 200, 40, "SETTINGS", GREY)
 
-def screen_settings():
-    display.fill_rectangle(0, 0, 240, 320, BLACK)
-    draw_header("SETTINGS")
+    button(20, 260, 200, 40, "SETTINGS", GREY, WHITE, go, "SETTINGS")
+
+def settings_widgets():
     batt_status = "ON" if db["user"].get("show_batt", True) else "OFF"
     batt_color = GREEN if db["user"].get("show_batt", True) else RED
     dim_status = "ON" if db["user"].get("auto_dim", True) else "OFF"
     dim_color = GREEN if db["user"].get("auto_dim", True) else RED
-    
-    draw_btn(20, 50, 200, 35, "EXPORT DATA CSV", GREEN, BLACK)
-    draw_btn(20, 95, 200, 35, "AUTO DIM: " + dim_status, dim_color, BLACK)
-    draw_btn(20, 140, 200, 35, "BATTERY: " + batt_status, batt_color, BLACK)
-    draw_btn(20, 185, 200, 35, "FILE EXPLORER", BLUE, WHITE)
-    draw_btn(20, 230, 200, 35, "FACTORY RESET", RED, WHITE)
-    draw_btn(0, 280, 240, 40, "BACK", GREY)
+    view.set("dim", draw_btn, 20, 95, 200, 35, "AUTO DIM: " + dim_status, dim_color, BLACK)
+    view.set("batt", draw_btn, 20, 140, 200, 35, "BATTERY: " + batt_status, batt_color, BLACK)
+    view.set("fmt", draw_btn, 160, 50, 60, 35, db["user"].get("export_fmt", "csv").upper(), CYAN, BLACK)
 
+@route("SETTINGS")
+@composited
+def screen_settings():
+    display.fill_rectangle(0, 0, 240, 320, BLACK)
+    draw_header("SETTINGS")
+    view.clear()
+    settings_widgets()
+    view.render(full=True)
+    hits.add(20, 95, 200, 35, toggle_option, "auto_dim")
+    hits.add(20, 140, 200, 35, toggle_option, "show_batt")
+    hits.add(160, 50, 60, 35, cycle_export_fmt)
+    button(20, 50, 65, 35, "EXP ALL", GREEN, BLACK, start_export, False)
+    button(90, 50, 65, 35, "EXP NEW", GREEN, BLACK, start_export, True)
+    button(20, 185, 200, 35, "FILE EXPLORER", BLUE, WHITE, go, "FILES")
+    button(20, 230, 200, 35, "FACTORY RESET", RED, WHITE, go, "RESET_CONFIRM")
+    button(0, 280, 240, 40, "BACK", GREY, WHITE, go, "HOME")
+
+@route("FILES")
+@composited
 def screen_files():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("SD FILES")
@@ -363,16 +624,20 @@ def screen_files():
             display.draw_text("/data/" + f, 10, y, GOLD, BLACK)
             y += 20
     except: display.draw_text("Error Reading SD", 10, 50, RED, BLACK)
-    draw_btn(0, 280, 240, 40, "BACK", GREY)
+    button(0, 280, 240, 40, "BACK", GREY, WHITE, go, "SETTINGS")
 
+@route("RESET_CONFIRM")
+@composited
 def screen_reset_confirm():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("CONFIRM RESET")
     display.draw_text("DELETE ALL DATA?", 30, 100, RED, BLACK)
     display.draw_text("Cannot be undone.", 35, 130, WHITE, BLACK)
-    draw_btn(20, 180, 90, 50, "NO", GREEN, BLACK)
-    draw_btn(130, 180, 90, 50, "YES", RED, WHITE)
+    button(20, 180, 90, 50, "NO", GREEN, BLACK, go, "SETTINGS")
+    button(130, 180, 90, 50, "YES", RED, WHITE, confirm_reset)
 
+@route("TROPHIES")
+@composited
 def screen_trophies():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("TROPHIES")
@@ -385,58 +650,69 @@ def screen_trophies():
             data = next((item for item in ACHIEVEMENTS if item["id"] == t_id), None)
             if data:
                 display.fill_rectangle(10, y, 220, 40, GREY)
-                display.fill_rectangle(10, y, 40, 40, GOLD) 
+                display.blit_sprite(TROPHY, 10, y, 4, bg=GREY)
                 display.draw_text(data["name"], 60, y+5, GOLD, GREY)
                 display.draw_text(data["desc"], 60, y+20, WHITE, GREY)
                 y += 50
-    draw_btn(0, 280, 70, 40, "BACK", RED)
-    if start_idx > 0: draw_btn(80, 280, 70, 40, "< PREV", BLUE)
-    if start_idx + 5 < len(db["user"]["trophies"]): draw_btn(160, 280, 70, 40, "NEXT >", BLUE)
+    button(0, 280, 70, 40, "BACK", RED, WHITE, go, "STATS")
+    draw_pager(80, 160, 70, start_idx > 0, start_idx + 5 < len(db["user"]["trophies"]), flip_page)
 
+@route("STATS")
+@composited
 def screen_stats():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("DOJO STATS")
-    logs, fav, fast = calc_stats()
-    display.draw_text("TOTAL LOGS:", 10, 60, WHITE, BLACK)
-    display.draw_text(str(logs), 10, 80, GREEN, BLACK)
-    display.draw_text("FAVORITE TOOL:", 10, 120, WHITE, BLACK)
-    display.draw_text(fav[:18], 10, 140, CYAN, BLACK)
-    display.draw_text("FASTEST PICK:", 10, 180, WHITE, BLACK)
-    display.draw_text(fast, 10, 200, GOLD, BLACK)
-    draw_btn(40, 230, 160, 40, "VIEW TROPHIES", GOLD, BLACK)
-    draw_btn(0, 280, 240, 40, "BACK", RED)
-
+    logs, fav, fast, median, top_belt, top_month = calc_stats()
+    st = db["user"]["stats"]
+    display.draw_text("TOTAL LOGS:", 10, 50, WHITE, BLACK)
+    display.draw_text(str(logs), 10, 65, GREEN, BLACK)
+    display.draw_text("FAVORITE TOOL:", 10, 90, WHITE, BLACK)
+    display.draw_text(fav[:18], 10, 105, CYAN, BLACK)
+    display.draw_text("FASTEST / MEDIAN:", 10, 130, WHITE, BLACK)
+    display.draw_text("{} / {}".format(fmt_sec(fast), fmt_sec(median)), 10, 145, GOLD, BLACK)
+    display.draw_text("TOP BELT / MONTH:", 10, 170, WHITE, BLACK)
+    belt_txt = "{} ({})".format(top_belt.upper(), st["belts"][top_belt]) if top_belt else "--"
+    month_txt = "{} ({})".format(top_month, st["months"][top_month]) if top_month else "--"
+    display.draw_text(belt_txt + " " + month_txt, 10, 185, ORANGE, BLACK)
+    button(40, 230, 160, 40, "VIEW TROPHIES", GOLD, BLACK, open_paged, "TROPHIES")
+    button(0, 280, 240, 40, "BACK", RED, WHITE, go, "HOME")
+
+@route("ROULETTE")
+@composited
 def screen_roulette():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("TRAINING")
-    owned = get_owned_locks()
+    button(0, 280, 240, 40, "BACK", RED, WHITE, go, "HOME")
+    owned = get_owned_ids()
     if not owned:
         display.draw_text("No locks owned!", 50, 150, RED, BLACK)
-        draw_btn(0, 280, 240, 40, "BACK", RED)
         return
-    target = random.choice(owned)
+    target = catalog.get(random.choice(owned))
     display.draw_text("CHALLENGE LOCK:", 20, 60, WHITE, BLACK)
     display.fill_rectangle(20, 90, 200, 100, GREY)
     name = target['n']
-    belt = target.get('_belt', 'White')
+    belt = catalog.belt_of(target['id'])
     b_color = BELT_COLORS.get(belt, WHITE)
     display.draw_text(name[:18], 30, 110, WHITE, GREY)
     if len(name) > 18: display.draw_text(name[18:36], 30, 130, WHITE, GREY)
     display.draw_text(belt.upper() + " BELT", 30, 160, b_color, GREY)
-    draw_btn(20, 210, 200, 50, "SPIN AGAIN", ORANGE, BLACK)
-    draw_btn(0, 280, 240, 40, "BACK", RED)
+    button(20, 210, 200, 50, "SPIN AGAIN", ORANGE, BLACK, redraw)
 
+@route("MY_BELT")
+@composited
 def screen_my_belt():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("CURRENT RANK")
     rank = get_user_rank()
     rank_color = BELT_COLORS.get(rank, WHITE)
     txt = rank.upper() + " BELT"
-    t_x = 120 - (len(txt) * 4) 
+    t_x = 120 - (len(txt) * 4)
     display.draw_text(txt, t_x, 70, rank_color, BLACK)
     draw_belt_graphic(120, 170, rank_color)
-    draw_btn(0, 280, 240, 40, "BACK TO HOME", GREY)
+    button(0, 280, 240, 40, "BACK TO HOME", GREY, WHITE, go, "HOME")
 
+@route("BELTS")
+@composited
 def screen_belts():
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("SELECT BELT")
@@ -445,63 +721,121 @@ def screen_belts():
         color = BELT_COLORS.get(belt, WHITE)
         t_color = BLACK if belt in ["White", "Yellow", "Orange"] else WHITE
         x = 10 if i % 2 == 0 else 125
-        draw_btn(x, y, 105, 40, belt.upper(), color, t_color)
+        button(x, y, 105, 40, belt.upper(), color, t_color, open_belt, belt)
         if i % 2 == 1: y += 50
 
+# LIST and COLLECTION scroll in hardware: panel lines LIST_TOP..LIST_BOTTOM-1
+# are the scroll area, and a row is drawn only when it comes into view.
+# ROW_H divides the area, so a row always sits in one piece of it.
+LIST_TOP = 40
+LIST_BOTTOM = 280
+LIST_H = LIST_BOTTOM - LIST_TOP
+ROW_H = 30
+list_ids = [] # COLLECTION: owned lock ids, in list order
+
+def list_count():
+    if active_screen == "LIST": return catalog.size(current_belt)
+    return len(list_ids)
+
+def list_lock(idx):
+    # Row idx of the LIST/COLLECTION being shown, read from the catalog
+    if active_screen == "LIST": return catalog.lock_at(current_belt, idx)
+    return catalog.get(list_ids[idx]) if 0 <= idx < len(list_ids) else None
+
+def list_max():
+    return max(0, list_count() * ROW_H - LIST_H)
+
+@route("LIST")
 def screen_list(belt):
-    display.fill_rectangle(0, 0, 240, 320, BLACK)
     b_color = BELT_COLORS.get(belt, WHITE)
     t_color = BLACK if belt in ["White", "Yellow", "Orange"] else WHITE
-    draw_header("{} LOCKS".format(belt.upper()), b_color, t_color)
-    all_locks = db["locks"].get(belt, [])
-    start = current_page * items_per_page
-    page_locks = all_locks[start:start + items_per_page]
-    draw_lock_list(page_locks, start, len(all_locks))
+    draw_lock_list("{} LOCKS".format(belt.upper()), b_color, t_color)
 
+@route("COLLECTION")
 def screen_collection():
-    display.fill_rectangle(0, 0, 240, 320, BLACK)
-    draw_header("MY COLLECTION", GOLD, BLACK)
-    all_locks = get_owned_locks()
-    start = current_page * items_per_page
-    page_locks = all_locks[start:start + items_per_page]
-    draw_lock_list(page_locks, start, len(all_locks))
-
-def draw_lock_list(locks, start_idx, total_count):
-    y = 45
-    for lock in locks:
-        full_name = lock['n']
-        trunc = 18 if active_screen == "COLLECTION" else 22
-        disp_name = full_name[:trunc]
-        c = WHITE
-        prefix = " "
-        if full_name in db["user"]["picked"]: c, prefix = GREEN, "P"
-        elif active_screen == "LIST" and full_name in db["user"]["owned"]: c, prefix = GOLD, "*"
-        if active_screen == "COLLECTION":
-            display.fill_rectangle(5, y, 200, 25, GREY)
-            display.fill_rectangle(210, y, 25, 25, RED)
-            display.draw_text("X", 218, y+8, WHITE, RED)
-        else:
-            display.fill_rectangle(5, y, 230, 25, GREY)
-        display.draw_text("{} {}".format(prefix, disp_name), 10, y+8, c, GREY)
-        y += 28
-    draw_btn(0, 280, 70, 40, "BACK", GREY)
-    if start_idx > 0: draw_btn(80, 280, 70, 40, "< PREV", BLUE)
-    if start_idx + len(locks) < total_count: draw_btn(160, 280, 70, 40, "NEXT >", BLUE)
+    global list_ids
+    list_ids = get_owned_ids()
+    draw_lock_list("MY COLLECTION", GOLD, BLACK)
+
+def draw_lock_list(title, bg_color, text_color):
+    global list_scroll
+    list_scroll = min(list_scroll, list_max())
+    display.set_scroll_area(LIST_TOP, 320 - LIST_BOTTOM)
+    display.scroll(LIST_TOP + list_scroll % LIST_H)
+    # Header and buttons are outside the scroll area and drawn as usual
+    display.begin_frame()
+    display.fill_rectangle(0, 0, 240, LIST_TOP, BLACK)
+    draw_header(title, bg_color, text_color)
+    display.fill_rectangle(0, LIST_BOTTOM, 240, 320 - LIST_BOTTOM, BLACK)
+    button(0, 280, 70, 40, "BACK", GREY, WHITE, go, "BELTS" if active_screen == "LIST" else "HOME")
+    draw_list_pager()
+    display.end_frame()
+    hits.add(80, 280, 70, 40, scroll_list, -LIST_H)
+    hits.add(160, 280, 70, 40, scroll_list, LIST_H)
+    hits.gesture(SWIPE_RIGHT, scroll_list, -LIST_H)
+    hits.gesture(SWIPE_LEFT, scroll_list, LIST_H)
+    hits.gesture(DRAG, drag_list)
+    hits.gesture(FLING, fling_list)
+    hits.area(0, LIST_TOP, 240, LIST_H, tap_list)
+    paint_list(list_scroll, list_scroll + LIST_H)
+
+def draw_list_pager():
+    # Both stay put while the list scrolls; grey = nothing more that way
+    draw_btn(80, 280, 70, 40, "< PREV", BLUE if list_scroll > 0 else GREY)
+    draw_btn(160, 280, 70, 40, "NEXT >", BLUE if list_scroll < list_max() else GREY)
+
+def paint_list(v0, v1):
+    # List lines v0..v1-1 (at most LIST_H of them), a row at a time: rows
+    # LIST_H apart share their place in the scroll area
+    for i in range(v0 // ROW_H, (v1 - 1) // ROW_H + 1):
+        top = i * ROW_H
+        y = LIST_TOP + top % LIST_H
+        display.begin_frame()
+        draw_list_row(list_lock(i), y)
+        display.end_frame(y + max(v0, top) - top, y + min(v1, top + ROW_H) - top)
+
+def draw_list_row(lock, y):
+    display.fill_rectangle(0, y, 240, ROW_H, BLACK)
+    if lock is None: return
+    y += 3
+    c = WHITE
+    prefix = " "
+    if lock['id'] in db["user"]["picked"]: c, prefix = GREEN, "P"
+    elif active_screen == "LIST" and lock['id'] in db["user"]["owned"]: c, prefix = GOLD, "*"
+    if active_screen == "COLLECTION":
+        display.fill_rectangle(5, y, 200, 25, GREY)
+        display.fill_rectangle(210, y, 25, 25, RED)
+        display.draw_text("X", 218, y+8, WHITE, RED)
+    else:
+        display.fill_rectangle(5, y, 230, 25, GREY)
+    draw_fitted("{} {}".format(prefix, lock['n']), 10, y, 25, 190 if active_screen == "COLLECTION" else 220, c, GREY)
+
+def detail_widgets(lock):
+    is_owned = lock['id'] in db["user"]["owned"]
+    is_picked = lock['id'] in db["user"]["picked"]
+    view.set("owned", draw_btn, 10, 40, 105, 40, "OWNED" if is_owned else "NOT OWNED", GREEN if is_owned else GREY)
+    view.set("picked", draw_btn, 125, 40, 105, 40, "PICKED" if is_picked else "NOT PICKED", GOLD if is_picked else GREY, BLACK if is_picked else WHITE)
 
+@route("DETAIL")
+@composited
 def screen_detail(lock):
     display.fill_rectangle(0, 0, 240, 320, BLACK)
-    draw_header(lock['n'][:18], GREY)
-    is_owned = lock['n'] in db["user"]["owned"]
-    is_picked = lock['n'] in db["user"]["picked"]
-    draw_btn(10, 40, 105, 40, "OWNED" if is_owned else "NOT OWNED", GREEN if is_owned else GREY)
-    draw_btn(125, 40, 105, 40, "PICKED" if is_picked else "NOT PICKED", GOLD if is_picked else GREY, BLACK if is_picked else WHITE)
+    draw_header(lock['n'], GREY)
+    view.clear()
+    detail_widgets(lock)
+    view.render(full=True)
+    hits.add(10, 40, 105, 40, toggle_lock, "owned")
+    hits.add(125, 40, 105, 40, toggle_lock, "picked")
     display.fill_rectangle(0, 95, 240, 2, BLUE)
     display.draw_text("LOGBOOK", 10, 105, BLUE, BLACK)
-    logs = db["user"]["logs"].get(lock['n'], [])
+    fastest, median = lock_stats(lock['n'])
+    if fastest is not None:
+        display.draw_text("BEST {}/{}".format(fmt_sec(fastest), fmt_sec(median)), 90, 105, GOLD, BLACK)
+    logs, _ = lock_logs(lock['n'], 0, 3)
     y = 125
     if not logs: display.draw_text("No logs yet.", 10, y, LIGHT_GREY, BLACK)
     else:
-        for i, log in enumerate(logs[:3]):
+        for i, log in enumerate(logs):
             tool_name = log.get('tool', 'Unknown')
             date_short = log['date'][5:]
             time_str = ""
@@ -511,66 +845,99 @@ def screen_detail(lock):
             txt = "{}{} {}".format(date_short, time_str, star_str)
             display.draw_text(txt, 10, y, WHITE, BLACK)
             y += 20
-    draw_btn(20, 200, 100, 40, "MANUAL LOG", BLUE)
-    draw_btn(130, 200, 90, 40, "TIMER", CYAN, BLACK)
-    draw_btn(20, 250, 200, 40, "VIEW HISTORY", LIGHT_GREY)
-    draw_btn(0, 300, 80, 20, "< BACK", RED)
+    button(20, 200, 100, 40, "MANUAL LOG", BLUE, WHITE, new_log, None)
+    button(130, 200, 90, 40, "TIMER", CYAN, BLACK, open_timer)
+    button(20, 250, 200, 40, "VIEW HISTORY", LIGHT_GREY, WHITE, open_history)
+    button(0, 300, 80, 20, "< BACK", RED, WHITE, leave_detail)
 
+@route("TIMER")
+@composited
 def screen_timer():
+    global timer_shown
     display.fill_rectangle(0, 0, 240, 320, BLACK)
     draw_header("STOPWATCH")
     display.fill_rectangle(20, 60, 200, 60, GREY)
-    draw_big_time(25, 65, "00:00", WHITE, GREY, size=10)
+    timer_shown = None
+    draw_timer(0)
     if not timer_running:
         draw_btn(20, 160, 100, 50, "START", GREEN)
     else:
         draw_btn(20, 160, 100, 50, "STOP", RED)
-    draw_btn(130, 160, 90, 50, "RESET", LIGHT_GREY, BLACK)
-    draw_btn(40, 220, 160, 50, "LOG THIS PICK", BLUE)
-    draw_btn(0, 290, 80, 30, "CANCEL", RED)
+    hits.add(20, 160, 100, 50, start_stop_timer)
+    button(130, 160, 90, 50, "RESET", LIGHT_GREY, BLACK, reset_timer)
+    button(40, 220, 160, 50, "LOG THIS PICK", BLUE, WHITE, log_timer)
+    button(0, 290, 80, 30, "CANCEL", RED, WHITE, leave_timer)
 
-def screen_add_log():
-    display.fill_rectangle(0, 0, 240, 320, BLACK)
-    draw_header("NEW LOG ENTRY")
-    y_off = 20 if draft_log['dur'] else 0
-    if draft_log['dur']: display.draw_text("TIME: " + draft_log['dur'], 80, 40, CYAN, BLACK)
-    def draw_split_btn(x, y, w, text):
-        draw_btn(x, y, w, 30, text, GREY)
-        display.fill_rectangle(x + (w // 2), y+2, 1, 26, BLACK)
-    y = 40 + y_off
-    
+def add_log_widgets():
+    y = 60 if draft_log['dur'] else 40
     # Manual Date Controls (Since we lost WiFi sync)
-    draw_split_btn(5, y, 70, "< {:02d} >".format(draft_log['m']))
-    draw_split_btn(85, y, 70, "< {:02d} >".format(draft_log['d']))
-    draw_split_btn(165, y, 70, "< {} >".format(str(draft_log['y'])[-2:]))
+    view.set("m", draw_split_btn, 5, y, 70, "< {:02d} >".format(draft_log['m']))
+    view.set("d", draw_split_btn, 85, y, 70, "< {:02d} >".format(draft_log['d']))
+    view.set("y", draw_split_btn, 165, y, 70, "< {} >".format(str(draft_log['y'])[-2:]))
     y += 35
-    
-    display.draw_text("Tool:", 5, y+5, WHITE, BLACK)
-    draw_btn(50, y, 180, 30, "< {} >".format(OPT_TOOLS[draft_log['tool']]), BLUE)
+    view.set("tool", draw_btn, 50, y, 180, 30, "< {} >".format(OPT_TOOLS[draft_log['tool']]), BLUE)
     y += 35
-    display.draw_text("Size:", 5, y+5, WHITE, BLACK)
-    draw_btn(50, y, 180, 30, "< P:{} / T:{} >".format(OPT_PICK_SIZE[draft_log['p_size']], OPT_TEN_SIZE[draft_log['t_size']]), BLUE)
+    view.set("size", draw_btn, 50, y, 180, 30, "< P:{} / T:{} >".format(OPT_PICK_SIZE[draft_log['p_size']], OPT_TEN_SIZE[draft_log['t_size']]), BLUE)
     y += 35
-    draw_btn(5, y, 110, 30, "< {} >".format(OPT_STYLE[draft_log['style']]), BLUE)
-    draw_btn(125, y, 110, 30, "< {} >".format(OPT_TENSION[draft_log['tension']]), BLUE)
+    view.set("style", draw_btn, 5, y, 110, 30, "< {} >".format(OPT_STYLE[draft_log['style']]), BLUE)
+    view.set("tension", draw_btn, 125, y, 110, 30, "< {} >".format(OPT_TENSION[draft_log['tension']]), BLUE)
     y += 35
-    display.draw_text("Diff:", 5, y+5, WHITE, BLACK)
-    draw_btn(50, y, 180, 30, "< {} STARS >".format(draft_log['rating']), GOLD, BLACK)
-    draw_btn(10, 270, 105, 40, "CANCEL", RED)
-    draw_btn(125, 270, 105, 40, "SAVE LOG", GREEN)
-
+    view.set("rating", draw_btn, 50, y, 180, 30, "< {} STARS >".format(draft_log['rating']), GOLD, BLACK)
+
+def add_log_steppers():
+    # Same layout as add_log_widgets; the size button steps P on its left
+    # half and T on its right
+    y = 60 if draft_log['dur'] else 40
+    stepper("m", 5, y, 70)
+    stepper("d", 85, y, 70)
+    stepper("y", 165, y, 70)
+    stepper("tool", 50, y + 35, 180)
+    stepper("p_size", 50, y + 70, 90)
+    stepper("t_size", 140, y + 70, 90)
+    stepper("style", 5, y + 105, 110)
+    stepper("tension", 125, y + 105, 110)
+    stepper("rating", 50, y + 140, 180)
+
+@route("ADD_LOG")
+@composited
+def screen_add_log():
+    display.fill_rectangle(0, 0, 240, 320, BLACK)
+    draw_header("NEW LOG ENTRY")
+    y_off = 20 if draft_log['dur'] else 0
+    if draft_log['dur']: display.draw_text("TIME: " + draft_log['dur'], 80, 40, CYAN, BLACK)
+    view.clear()
+    add_log_widgets()
+    view.render(full=True)
+    add_log_steppers()
+    display.draw_text("Tool:", 5, 80 + y_off, WHITE, BLACK)
+    display.draw_text("Size:", 5, 115 + y_off, WHITE, BLACK)
+    display.draw_text("Diff:", 5, 185 + y_off, WHITE, BLACK)
+    button(10, 270, 105, 40, "CANCEL", RED, WHITE, go, "DETAIL", selected_lock)
+    button(125, 270, 105, 40, "SAVE LOG", GREEN, WHITE, save_log)
+
+@route("HISTORY")
+@composited
 def screen_history():
+    global history_page
     display.fill_rectangle(0, 0, 240, 320, BLACK)
-    draw_header("PICK HISTORY")
-    logs = db["user"]["logs"].get(selected_lock['n'], [])
+    start = history_page * HISTORY_ROWS
+    logs, total = lock_logs(selected_lock['n'], start, HISTORY_ROWS)
+    if not logs and history_page > 0:
+        # Last entry of the last page was deleted
+        history_page -= 1
+        start -= HISTORY_ROWS
+        logs, total = lock_logs(selected_lock['n'], start, HISTORY_ROWS)
+    if total > HISTORY_ROWS: draw_header("HISTORY {}-{}/{}".format(start + 1, start + len(logs), total))
+    else: draw_header("PICK HISTORY")
     if not logs: display.draw_text("No records found.", 50, 150, WHITE, BLACK)
     y = 40
-    for log in logs[:4]:
+    for i, log in enumerate(logs):
         p_sz = log.get('p_size', '?')
         t_sz = log.get('t_size', '?')
         display.fill_rectangle(5, y, 200, 55, GREY)
         display.fill_rectangle(210, y, 25, 55, RED)
         display.draw_text("X", 218, y+20, WHITE, RED)
+        hits.add(210, y, 25, 55, delete_row, start + i)
         time_str = ""
         if 'dur' in log and log['dur']: time_str = "({})".format(log['dur'])
         rating = log.get('rating', 0)
@@ -582,275 +949,330 @@ def screen_history():
         display.draw_text(line2, 10, y+20, WHITE, GREY)
         display.draw_text(line3, 10, y+35, WHITE, GREY)
         y += 60
-    draw_btn(0, 280, 240, 40, "< BACK", RED)
+    button(0, 280, 80, 40, "< BACK", RED, WHITE, go, "DETAIL", selected_lock)
+    draw_pager(85, 165, 75, history_page > 0, start + len(logs) < total, flip_history, ("PREV", "NEXT"))
+
+def draw_pager(prev_x, next_x, w, has_prev, has_next, flip, labels=("< PREV", "NEXT >")):
+    # PREV/NEXT along the bottom; swiping turns the page the same way
+    if has_prev:
+        button(prev_x, 280, w, 40, labels[0], BLUE, WHITE, flip, -1)
+        hits.gesture(SWIPE_RIGHT, flip, -1)
+    if has_next:
+        button(next_x, 280, w, 40, labels[1], BLUE, WHITE, flip, 1)
+        hits.gesture(SWIPE_LEFT, flip, 1)
+
+def stepper(key, x, y, w, h=30):
+    # A < > control: the left half steps draft_log[key] down, the right up
+    hits.add(x, y, w // 2, h, step_draft, key, -1)
+    hits.add(x + w // 2, y, w - w // 2, h, step_draft, key, 1)
+
+def repeatable(x, y):
+    # The < > controls repeat while held (see xpt2046.Gestures)
+    r = hits.find(x, y)
+    return r is not None and r[4] is step_draft
+
+def draggable(x, y):
+    # A drag scrolls the list it starts on
+    return DRAG in hits.gestures and LIST_TOP <= y < LIST_BOTTOM
+
+gestures = Gestures(touch, repeatable, draggable=draggable)
+
+# --- TOUCH HANDLING ---
+# What the tap targets above call. Screens pass their own arguments, so none
+# of these need to know where on the screen they were tapped.
+
+# draft_log key -> (lowest, highest) value of its < > control
+DRAFT_STEPS = {
+    "m": (1, 12), "d": (1, 31), "y": (2020, 2040), "rating": (1, 5),
+    "tool": (0, len(OPT_TOOLS) - 1), "style": (0, len(OPT_STYLE) - 1),
+    "p_size": (0, len(OPT_PICK_SIZE) - 1), "t_size": (0, len(OPT_TEN_SIZE) - 1),
+    "tension": (0, len(OPT_TENSION) - 1),
+}
 
-# --- MAIN LOOP ---
-load_data()
-screen_splash()
-last_touch = time.ticks_ms()
-brightness_state = 2 
+def go_home():
+    global timer_running
+    timer_running = False
+    go("HOME")
+
+def open_paged(name, *args):
+    global current_page, list_scroll
+    current_page = list_scroll = 0
+    go(name, *args)
+
+def open_belt(belt):
+    global current_belt
+    current_belt = belt
+    open_paged("LIST", belt)
+
+def flip_page(delta):
+    global current_page
+    current_page += delta
+    redraw()
+
+def flip_history(delta):
+    global history_page
+    history_page += delta
+    redraw()
+
+def scroll_list(delta):
+    # Moves the list by delta px (clamped at the ends): the panel shifts
+    # what is there and only the lines coming into view are drawn.
+    # False if it was already at that end
+    global list_scroll
+    s = max(0, min(list_scroll + delta, list_max()))
+    if s == list_scroll: return False
+    ends = (list_scroll > 0, list_scroll < list_max())
+    old, list_scroll = list_scroll, s
+    display.scroll(LIST_TOP + s % LIST_H)
+    if s > old: paint_list(max(old + LIST_H, s), s + LIST_H)
+    else: paint_list(s, min(old, s + LIST_H))
+    if ends != (s > 0, s < list_max()): draw_list_pager()
+    return True
+
+def drag_list(dy):
+    global list_velocity
+    list_velocity = 0
+    scroll_list(-dy)
+
+def fling_list(vy):
+    # Carried on by scroll_task
+    global list_velocity
+    list_velocity = -vy
+
+def tap_list(x, y):
+    # Rows move with the scroll: which one is here depends on list_scroll
+    lock = list_lock((list_scroll + y - LIST_TOP) // ROW_H)
+    if lock is None: return
+    if active_screen == "COLLECTION" and x >= 210: remove_lock(lock)
+    else: open_lock(lock)
+
+def open_lock(lock):
+    global selected_lock, return_screen
+    selected_lock, return_screen = lock, active_screen
+    go("DETAIL", lock)
+
+def leave_detail():
+    if return_screen == "COLLECTION": go("COLLECTION")
+    else: go("LIST", current_belt)
+
+def remove_lock(lock):
+    full_remove_lock(lock['id'])
+    redraw()
+
+def toggle_lock(list_type):
+    toggle_status(selected_lock['id'], list_type)
+    detail_widgets(selected_lock); view.render()
+
+def toggle_option(key):
+    set_option(key, not db["user"].get(key, True))
+    settings_widgets(); view.render()
+
+def cycle_export_fmt():
+    set_option("export_fmt", "ndjson" if db["user"].get("export_fmt", "csv") == "csv" else "csv")
+    settings_widgets(); view.render()
+
+def start_export(incremental):
+    display.fill_rectangle(20, 100, 200, 100, BLACK)
+    display.draw_text("EXPORTING...", 72, 140, WHITE, BLACK)
+    display.fill_rectangle(40, 170, 160, 8, GREY)
+    saver.submit(lambda fmt=db["user"].get("export_fmt", "csv"): export_job(fmt, incremental))
+
+def confirm_reset():
+    perform_factory_reset()
+    go("HOME")
+
+def open_history():
+    global history_page
+    history_page = 0
+    go("HISTORY")
+
+def delete_row(index):
+    delete_log_entry(selected_lock['n'], index)
+    redraw()
+
+def new_log(dur):
+    draft_log['dur'] = dur
+    go("ADD_LOG")
+
+def step_draft(key, delta):
+    draft_log[key] = adjust_val(draft_log[key], delta, *DRAFT_STEPS[key])
+    add_log_widgets(); view.render()
+
+def save_log():
+    add_log_entry(selected_lock)
+    go("DETAIL", selected_lock)
+
+def open_timer():
+    global timer_running, timer_elapsed
+    timer_running = False
+    timer_elapsed = 0
+    go("TIMER")
+
+def start_stop_timer():
+    global timer_running, timer_start, timer_elapsed
+    if not timer_running:
+        timer_running = True
+        timer_start = time.ticks_ms() - timer_elapsed
+        draw_btn(20, 160, 100, 50, "STOP", RED)
+    else:
+        timer_running = False
+        timer_elapsed = time.ticks_diff(time.ticks_ms(), timer_start)
+        draw_timer(timer_elapsed)
+        draw_btn(20, 160, 100, 50, "START", GREEN)
 
-while True:
-    # --- POWER MANAGEMENT ---
-    if db["user"].get("auto_dim", True):
-        idle_time = time.ticks_diff(time.ticks_ms(), last_touch)
-        if idle_time < 15000: # 0-15s: High
+def reset_timer():
+    global timer_running, timer_elapsed
+    timer_running = False
+    timer_elapsed = 0
+    draw_timer(0)
+    draw_btn(20, 160, 100, 50, "START", GREEN)
+
+def log_timer():
+    global timer_running
+    timer_running = False
+    new_log(format_time(timer_elapsed))
+
+def leave_timer():
+    global timer_running
+    timer_running = False
+    go("DETAIL", selected_lock)
+
+def handle_gesture(kind, x, y):
+    global last_touch
+    last_touch = time.ticks_ms() # Reset Idle Timer
+
+    # Swipes page like the PREV/NEXT buttons on screens that have them;
+    # drags and flings carry their distance or speed in y. A long press has
+    # no action: it fires while the finger is still down, and is not a tap
+    if kind == SWIPE_LEFT or kind == SWIPE_RIGHT: hits.fire(kind)
+    elif kind == DRAG or kind == FLING: hits.fire(kind, y)
+    elif kind == TAP or kind == REPEAT: hits.tap(x, y)
+
+# --- TASKS ---
+# Each job runs as its own asyncio task. Drawing is still synchronous, but a
+# slow screen no longer holds up the others for longer than one redraw, and
+# SD writes stay on the saver thread so they never block the loop.
+last_touch = time.ticks_ms()
+brightness_state = 2
+battery_pct = 0
+gesture_queue = []
+gesture_ready = asyncio.Event()
+pen_down = asyncio.ThreadSafeFlag()
+touch.wake = pen_down
+
+async def touch_task():
+    # Sleeps until PENIRQ fires, then samples every 10ms while the finger
+    # (or a long-press/repeat timer) is active. A press that starts while the
+    # screen is dim or off only wakes it: everything it turns into is dropped
+    # until the finger is lifted, so it never presses what is under it
+    global last_touch, brightness_state
+    holding = waking = False
+    while True:
+        if touch.int_pin is not None and not touch.down and not gestures.down: await pen_down.wait()
+        touch.poll()
+        if touch.down:
+            if not holding and brightness_state < 2:
+                waking = True
+                bl.duty(1023)
+                brightness_state = 2
+            holding = True
+            last_touch = time.ticks_ms() # Holding counts as activity
+        while True:
+            g = gestures.next()
+            if g is None: break
+            if waking: continue
+            gesture_queue.append(g)
+            gesture_ready.set()
+        if not touch.down and not gestures.down: holding = waking = False
+        await asyncio.sleep_ms(10)
+
+async def ui_task():
+    # Screens react to input events as they arrive
+    while True:
+        await gesture_ready.wait()
+        gesture_ready.clear()
+        while gesture_queue:
+            handle_gesture(*gesture_queue.pop(0))
+            await asyncio.sleep_ms(0)
+
+async def timer_task():
+    global timer_elapsed
+    while True:
+        if active_screen == "TIMER" and timer_running:
+            diff = time.ticks_diff(time.ticks_ms(), timer_start)
+            if diff // 100 != timer_elapsed // 100:
+                timer_elapsed = diff
+                draw_timer(timer_elapsed)
+        await asyncio.sleep_ms(20)
+
+async def scroll_task():
+    # A flung list keeps scrolling, slowing down, until it stops or hits
+    # an end; touching the panel again stops it
+    global list_velocity
+    while True:
+        if list_velocity:
+            if touch.down or abs(list_velocity) < 60: list_velocity = 0
+            elif not scroll_list(list_velocity // 50): list_velocity = 0
+            else: list_velocity = list_velocity * 7 // 8
+        await asyncio.sleep_ms(20)
+
+async def backlight_task():
+    global brightness_state
+    while True:
+        if db["user"].get("auto_dim", True):
+            idle_time = time.ticks_diff(time.ticks_ms(), last_touch)
+            if idle_time < 15000: # 0-15s: High
+                if brightness_state != 2: bl.duty(1023); brightness_state = 2
+            elif idle_time < 30000: # 15-30s: Dim
+                if brightness_state != 1: bl.duty(512); brightness_state = 1
+            else: # >30s: Low
+                if brightness_state != 0:
+                    bl.duty(100); brightness_state = 0
+                    saver.request_flush() # Going idle: make sure everything is on the card
+        else:
             if brightness_state != 2: bl.duty(1023); brightness_state = 2
-        elif idle_time < 30000: # 15-30s: Dim
-            if brightness_state != 1: bl.duty(512); brightness_state = 1
-        else: # >30s: Low
-            if brightness_state != 0: bl.duty(100); brightness_state = 0
-    else:
-        if brightness_state != 2: bl.duty(1023); brightness_state = 2
-
-    if active_screen == "TIMER" and timer_running:
-        now = time.ticks_ms()
-        diff = time.ticks_diff(now, timer_start)
-        if diff // 1000 != timer_elapsed // 1000:
-            timer_elapsed = diff
-            draw_big_time(25, 65, format_time(timer_elapsed), WHITE, GREY, size=10)
-
-    t = touch.get_touch()
-    if t and (time.ticks_ms() - last_touch > 300):
-        # WAKE UP EVENT
-        x, y = t
-        last_touch = time.ticks_ms() # Reset Idle Timer
-        
-        # If we were dim or off, just wake up and ignore the touch coordinate
-        if brightness_state < 2:
-            bl.duty(1023)
-            brightness_state = 2
-            continue 
-        
-        # Normal Touch Processing
-        if active_screen == "SPLASH":
-            active_screen = "HOME"
-            screen_home()
-            continue
-
-        if active_screen != "HOME" and x > 170 and y < 40:
-             timer_running = False
-             active_screen = "HOME"
-             screen_home()
-             continue 
-
-        if active_screen == "HOME":
-            if 70 < y < 130:
-                if x < 120: 
-                    active_screen, return_screen = "BELTS", "BELTS"
-                    screen_belts()
-                else:
-                    active_screen, return_screen = "COLLECTION", "COLLECTION"
-                    current_page = 0
-                    screen_collection()
-            elif 140 < y < 200:
-                if x < 120:
-                    active_screen = "ROULETTE"
-                    screen_roulette()
-                else:
-                    active_screen = "STATS"
-                    screen_stats()
-            elif 210 < y < 250: 
-                active_screen = "MY_BELT"
-                screen_my_belt()
-            elif y > 260: 
-                active_screen = "SETTINGS"
-                screen_settings()
-
-        elif active_screen == "SETTINGS":
-            if y > 280: active_screen = "HOME"; screen_home()
-            elif 50 < y < 85: # CSV
-                success = export_csv()
-                msg = "SAVED TO SD!" if success else "SD ERROR!"
+        await asyncio.sleep_ms(250)
+
+async def battery_task():
+    # The ADC is read here only; HOME's icon is refreshed when its fill changes
+    global battery_pct
+    while True:
+        pct = get_battery_pct()
+        if active_screen == "HOME" and 18 * pct // 100 != 18 * battery_pct // 100:
+            battery_pct = pct
+            display.fill_rectangle(216, 6, 18, 8, BELT_COLORS.get(get_user_rank(), WHITE))
+            draw_battery_icon()
+        battery_pct = pct
+        await asyncio.sleep_ms(10000)
+
+async def persistence_task():
+    # SD writes run on the saver thread; this shows what the export job
+    # reports: a growing bar, then the result for 2s before restoring
+    global export_progress, export_status
+    while True:
+        if export_progress is not None:
+            done, total = export_progress
+            export_progress = None
+            if active_screen == "SETTINGS" and total:
+                display.fill_rectangle(40, 170, (160 * done) // total, 8, GREEN)
+        if export_status is not None:
+            ok, msg = export_status
+            export_status = None
+            if active_screen == "SETTINGS":
                 display.fill_rectangle(20, 100, 200, 100, BLACK)
-                display.draw_text(msg, 60, 140, WHITE, BLACK)
-                time.sleep(2)
-                screen_settings()
-            elif 95 < y < 130: # AUTO DIM
-                db["user"]["auto_dim"] = not db["user"].get("auto_dim", True)
-                save_data()
-                screen_settings()
-            elif 140 < y < 175: # BATTERY
-                db["user"]["show_batt"] = not db["user"].get("show_batt", True)
-                save_data()
-                screen_settings()
-            elif 185 < y < 220: # FILES
-                active_screen = "FILES"
-                screen_files()
-            elif 230 < y < 265: # RESET
-                active_screen = "RESET_CONFIRM"
-                screen_reset_confirm()
-
-        elif active_screen == "FILES":
-            if y > 280: active_screen = "SETTINGS"; screen_settings()
-
-        elif active_screen == "RESET_CONFIRM":
-            if 180 < y < 230:
-                if x < 110: 
-                    active_screen = "SETTINGS"
-                    screen_settings()
-                elif x > 130: 
-                    perform_factory_reset()
-                    active_screen = "HOME"
-                    screen_home()
-
-        elif active_screen == "STATS":
-            if y > 280: active_screen = "HOME"; screen_home()
-            elif 230 < y < 270: 
-                active_screen = "TROPHIES"
-                current_page = 0
-                screen_trophies()
-
-        elif active_screen == "TROPHIES":
-            if y > 280: 
-                if x < 70:
-                    active_screen = "STATS"
-                    screen_stats()
-                elif 80 < x < 150 and current_page > 0:
-                    current_page -= 1
-                    screen_trophies()
-                elif x > 160 and (current_page + 1) * 5 < len(db["user"]["trophies"]):
-                    current_page += 1
-                    screen_trophies()
-
-        elif active_screen == "MY_BELT":
-            if y > 280: active_screen = "HOME"; screen_home()
-        elif active_screen == "ROULETTE":
-            if y > 280: active_screen = "HOME"; screen_home()
-            elif 210 < y < 260: screen_roulette() 
-
-        elif active_screen == "BELTS":
-            if y > 40:
-                row, col = (y - 40) // 50, 0 if x < 120 else 1
-                idx = row * 2 + col
-                if idx < len(BELT_ORDER):
-                    current_belt, current_page, active_screen = BELT_ORDER[idx], 0, "LIST"
-                    screen_list(current_belt)
-        elif active_screen in ["LIST", "COLLECTION"]:
-            target_locks = db["locks"].get(current_belt, []) if active_screen == "LIST" else get_owned_locks()
-            if active_screen == "COLLECTION" and x > 200 and 45 < y < 270:
-                 idx = (y - 45) // 28
-                 real_idx = (current_page * items_per_page) + idx
-                 if real_idx < len(target_locks):
-                     full_remove_lock(target_locks[real_idx]['n'])
-                     screen_collection()
-                     continue 
-            if y > 280: 
-                if x < 70: 
-                    active_screen = "BELTS" if active_screen == "LIST" else "HOME"
-                    if active_screen == "BELTS": screen_belts()
-                    else: screen_home()
-                elif 80 < x < 150 and current_page > 0:
-                    current_page -= 1
-                    if active_screen == "LIST": screen_list(current_belt)
-                    else: screen_collection()
-                elif x > 160 and (current_page + 1) * items_per_page < len(target_locks):
-                    current_page += 1
-                    if active_screen == "LIST": screen_list(current_belt)
-                    else: screen_collection()
-            elif y > 45:
-                idx = (y - 45) // 28
-                real_idx = (current_page * items_per_page) + idx
-                if real_idx < len(target_locks):
-                    selected_lock = target_locks[real_idx]
-                    active_screen = "DETAIL"
-                    screen_detail(selected_lock)
-        
-        elif active_screen == "DETAIL":
-            if y > 300: 
-                active_screen = return_screen
-                if active_screen == "COLLECTION": screen_collection()
-                else: active_screen = "LIST"; screen_list(current_belt)
-            elif 40 < y < 80:
-                if x < 120: toggle_status(selected_lock['n'], "owned")
-                else: toggle_status(selected_lock['n'], "picked")
-                screen_detail(selected_lock)
-            elif 200 < y < 240:
-                if x < 120: 
-                    draft_log['dur'] = None
-                    active_screen = "ADD_LOG"
-                    screen_add_log()
-                else: 
-                    active_screen = "TIMER"
-                    timer_running = False
-                    timer_elapsed = 0
-                    screen_timer()
-            elif 250 < y < 290: active_screen = "HISTORY"; screen_history()
-            
-        elif active_screen == "TIMER":
-            if 160 < y < 210 and x < 125:
-                if not timer_running:
-                    timer_running = True
-                    timer_start = time.ticks_ms() - timer_elapsed
-                    draw_btn(20, 160, 100, 50, "STOP", RED)
-                else:
-                    timer_running = False
-                    timer_elapsed = time.ticks_diff(time.ticks_ms(), timer_start)
-                    draw_btn(20, 160, 100, 50, "START", GREEN)
-            elif 160 < y < 210 and x > 125:
-                timer_running = False
-                timer_elapsed = 0
-                draw_big_time(25, 65, "00:00", WHITE, GREY, size=10)
-                draw_btn(20, 160, 100, 50, "START", GREEN)
-            elif 220 < y < 270:
-                timer_running = False
-                draft_log['dur'] = format_time(timer_elapsed)
-                active_screen = "ADD_LOG"
-                screen_add_log()
-            elif y > 290:
-                timer_running = False
-                active_screen = "DETAIL"
-                screen_detail(selected_lock)
-        
-        elif active_screen == "ADD_LOG":
-            y_off = 20 if draft_log['dur'] else 0
-            if 30 + y_off < y < 75 + y_off: 
-                if x < 80: 
-                    delta = -1 if x < 40 else 1 
-                    draft_log['m'] = adjust_val(draft_log['m'], delta, 1, 12)
-                elif x < 160: 
-                    delta = -1 if x < 120 else 1
-                    draft_log['d'] = adjust_val(draft_log['d'], delta, 1, 31)
-                else: 
-                    delta = -1 if x < 200 else 1
-                    draft_log['y'] = adjust_val(draft_log['y'], delta, 2020, 2040)
-                screen_add_log()
-            elif 75 + y_off < y < 110 + y_off:
-                delta = -1 if x < 120 else 1
-                draft_log['tool'] = adjust_idx(draft_log['tool'], delta, len(OPT_TOOLS))
-                screen_add_log()
-            elif 110 + y_off < y < 145 + y_off:
-                if x < 120:
-                    delta = -1 if x < 60 else 1
-                    draft_log['p_size'] = adjust_idx(draft_log['p_size'], delta, len(OPT_PICK_SIZE))
-                else:
-                    delta = -1 if x < 180 else 1
-                    draft_log['t_size'] = adjust_idx(draft_log['t_size'], delta, len(OPT_TEN_SIZE))
-                screen_add_log()
-            elif 145 + y_off < y < 180 + y_off:
-                if x < 120:
-                    delta = -1 if x < 60 else 1
-                    draft_log['style'] = adjust_idx(draft_log['style'], delta, len(OPT_STYLE))
-                else:
-                    delta = -1 if x < 180 else 1
-                    draft_log['tension'] = adjust_idx(draft_log['tension'], delta, len(OPT_TENSION))
-                screen_add_log()
-            elif 180 + y_off < y < 215 + y_off:
-                delta = -1 if x < 120 else 1
-                draft_log['rating'] = adjust_val(draft_log['rating'], delta, 1, 5)
-                screen_add_log()
-            elif y > 260:
-                if x > 120: add_log_entry(selected_lock['n'])
-                active_screen = "DETAIL"
-                screen_detail(selected_lock)
-
-        elif active_screen == "HISTORY":
-            if y > 280: 
-                active_screen = "DETAIL"
-                screen_detail(selected_lock)
-            elif x > 200 and y > 40:
-                row_idx = (y - 40) // 60
-                delete_log_entry(selected_lock['n'], row_idx)
-                screen_history()
-
-    time.sleep(0.01)
+                display.draw_text(msg, 120 - (len(msg) * 4), 140, WHITE if ok else RED, BLACK)
+                await asyncio.sleep_ms(2000)
+                if active_screen == "SETTINGS": screen_settings()
+        await asyncio.sleep_ms(50)
+
+async def main():
+    for task in (touch_task, timer_task, scroll_task, backlight_task, battery_task, persistence_task):
+        asyncio.create_task(task())
+    await ui_task()
+
+# --- MAIN LOOP ---
+load_data()
+saver.start()
+battery_pct = get_battery_pct()
+screen_splash()
+asyncio.run(main())
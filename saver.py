@@ -0,0 +1,107 @@
+# Save as 'saver.py'
+# Write-behind persistence. The UI thread applies changes in RAM and queues
+# the journal ops; a worker on the second core writes them to the SD card
+# after a short debounce, folds the journal into a snapshot when it is idle
+# and runs one-off jobs (exports). Nothing on the UI thread waits for SD I/O
+# except an explicit flush().
+import _thread, time
+
+try:
+    ticks_ms, ticks_diff, sleep_ms = time.ticks_ms, time.ticks_diff, time.sleep_ms
+except AttributeError: # CPython, for host testing
+    ticks_ms = lambda: int(time.time() * 1000)
+    ticks_diff = lambda a, b: a - b
+    sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+class Saver:
+    def __init__(self, journal, snapshot, logbook=None, debounce_ms=300, idle_ms=2000):
+        # snapshot() returns the state dict; called with lock held. Changed
+        # logbook shards are rewritten along with it
+        self.journal = journal
+        self.snapshot = snapshot
+        self.logbook = logbook
+        self.debounce_ms = debounce_ms
+        self.idle_ms = idle_ms
+        self.lock = _thread.allocate_lock() # guards the user state
+        self.pending = []
+        self.jobs = []
+        self.dirty_at = ticks_ms()
+        self.compact_req = False
+        self.flush_req = False
+        self.running = False
+
+    def start(self):
+        self.running = True
+        _thread.start_new_thread(self._run, ())
+
+    def record(self, op, apply):
+        # Apply op to RAM state and queue it for the journal
+        with self.lock:
+            apply(op)
+            self.journal.stamp(op)
+            self.pending.append(op)
+            self.dirty_at = ticks_ms()
+
+    def submit(self, job):
+        self.jobs.append(job)
+
+    def request_compact(self):
+        self.compact_req = True
+
+    def request_flush(self):
+        # flush() without waiting for it
+        self.flush_req = True
+
+    def flush(self, timeout_ms=5000):
+        # Block until everything queued so far is on the card
+        self.flush_req = True
+        if not self.running:
+            self.step()
+            return
+        start = ticks_ms()
+        while self.flush_req and ticks_diff(ticks_ms(), start) < timeout_ms:
+            sleep_ms(10)
+
+    def _run(self):
+        while self.running:
+            try: self.step()
+            except Exception as e: print("Save Error:", e)
+            sleep_ms(20)
+
+    def step(self):
+        flushing = self.flush_req
+        quiet = ticks_diff(ticks_ms(), self.dirty_at)
+        if self.pending and (flushing or quiet >= self.debounce_ms):
+            with self.lock:
+                batch = self.pending
+                self.pending = []
+            try: self.journal.write(batch)
+            except:
+                # Back to the front of the queue for the next step; replay
+                # skips any ops a partial write already got onto the card
+                with self.lock: self.pending = batch + self.pending
+                raise
+        if self.compact_req or (self.journal.needs_compact() and quiet >= self.idle_ms):
+            logbook = self.logbook
+            with self.lock:
+                self.compact_req = False
+                text = self.journal.snapshot_text(self.snapshot())
+                plan = logbook.plan(self.journal.seq) if logbook else None
+            # SD work runs without the lock: only this thread writes the
+            # journal and shards. Shards first: until the swap the journal
+            # still has their ops. A factory reset deletes them only after
+            # the swap, and its snapshot says so (see main.snapshot_user),
+            # so a wipe cut short is done again on the next boot
+            wipe = plan and plan[3]
+            self.journal.write_tmp(text)
+            if plan and not wipe: logbook.write(plan)
+            self.journal.swap()
+            if wipe:
+                logbook.write(plan)
+                self.compact_req = True # again, to drop the mark
+            if plan:
+                with self.lock: logbook.commit(plan)
+        while self.jobs:
+            self.jobs.pop(0)()
+        # A compaction asked for after this step checked waits for the next
+        if flushing and not self.pending and not self.compact_req: self.flush_req = False
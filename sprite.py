@@ -0,0 +1,34 @@
+# Save as 'sprite.py'
+# Small run-length encoded, palette indexed images (icons, badges). Made on
+# a computer from PNGs by tools/png2sprite.py; drawn by Display.blit_sprite.
+#
+#   'S' 'P'  magic
+#   width, height (one byte each)
+#   colors (up to 16), transparent index (255 = none)
+#   colors x RGB565, big-endian
+#   then each row, top to bottom, as runs of one byte:
+#   (length - 1) << 4 | palette index. A run never crosses a row.
+from array import array
+
+class Sprite:
+    def __init__(self, data):
+        if data[0:2] != b'SP': raise ValueError("not a sprite")
+        self.data = data
+        self.width, self.height = data[2], data[3]
+        n, self.transparent = data[4], data[5]
+        self.palette = [data[6 + i*2] << 8 | data[7 + i*2] for i in range(n)]
+        # Where each row's runs start (and where the last one ends), so any
+        # row can be drawn without decoding the ones above it
+        self.rows = array('H', [0] * (self.height + 1))
+        i = 6 + n * 2
+        for row in range(self.height):
+            self.rows[row] = i
+            x = 0
+            while x < self.width:
+                x += (data[i] >> 4) + 1
+                i += 1
+        self.rows[self.height] = i
+
+def load(path):
+    with open(path, "rb") as f:
+        return Sprite(f.read())
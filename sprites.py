@@ -0,0 +1,52 @@
+# Save as 'sprites.py'
+# Sprites for sprite.Sprite, made by tools/png2sprite.py. Do not edit:
+# change the PNGs and run it again.
+
+# assets/skull.png
+SKULL = (
+    b'SP\n\t\x02\x00\x00\x00\x00\x00\x10Q\x10\x00q\x00\x91!\x10\x01\x10\x11!\x10\x01\x10\x11A\x001\x00q'
+    b'\x00\x10\x01\x00\x01\x00\x01\x00\x01\x00\x10a\x00'
+)
+
+# assets/belt.png
+BELT = (
+    b'SPxP\x03\x00\x00\x00\x00\x00\xff\xff\xf0\xf0p\xf1\xf1q\xf0\xf0p\xf0\xf0p\xf1\xf1q\xf0\xf0p\xf0\xf0'
+    b'p\x11\xf2\xf22\x11\xf0\xf0p\xf0\xf0p\x11\xf2\xf22\x11\xf0\xf0p\xf0\xf0p\x11\xf2\xf22\x11\xf0\xf0p\xf1'
+    b'\xf1\x91\xf2\xf22\xf1\xf1\x91\xf1\xf1\x91\xf2\xf22\xf1\xf1\x91\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2'
+    b'\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22'
+    b'\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11'
+    b'\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf2'
+    b'2\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11'
+    b'\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\xf1\xf1'
+    b'q\xf2\xf2R\x11\x11\xf2\xf2R\xf1\xf1q\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2'
+    b'R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11'
+    b'\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2'
+    b'\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22'
+    b'\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\x11\xf2\xf2R\x11\xf2\xf22\x11\xf2\xf2R\x11\xf1'
+    b'\xf1\x91\xf2\xf22\xf1\xf1\x91\xf1\xf1\x91\xf2\xf22\xf1\xf1\x91\xf0\x80\x11\xc2\x11\xf2\xf22\x11\xc2\x11\xf0\x80\xf0\x80'
+    b'\x11\xc2\x11\xf2\xf22\x11\xc2\x11\xf0\x80\xf0\x80\x11\xc2\x11\xf2\xf22\x11\xc2\x11\xf0\x80\xf0\x80\x11\xc2\xf1\xf1q\xc2'
+    b'\x11\xf0\x80\xf0\x80\x11\xc2\xf1\xf1q\xc2\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2'
+    b'B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00'
+    b'\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11'
+    b'\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80'
+    b'\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11'
+    b'\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2'
+    b'B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80'
+    b'\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2'
+    b'B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00'
+    b'\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11'
+    b'\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80'
+    b'\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11'
+    b'\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2'
+    b'B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80'
+    b'\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2'
+    b'B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00'
+    b'\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11\xf0\x80\xf0\x80\x11\xf2B\x11\xf00\x11\xf2B\x11'
+    b'\xf0\x80\xf0\x80\xf1\x81\xf00\xf1\x81\xf0\x80\xf0\x80\xf1\x81\xf00\xf1\x81\xf0\x80'
+)
+
+# assets/trophy.png
+TROPHY = (
+    b'SP\n\n\x03\x00\x00\x00\xfe\xa0\xa3`\x10Q\x10\x91\x01\x00Q\x00\x01\x01\x00Q\x00\x01\x00q\x00\x10Q\x10'
+    b' 1 0\x110 2 \x10R\x10'
+)
@@ -0,0 +1,173 @@
+# Make font files for fontfile.py (Display.draw_text(font=...)).
+# Run from the repo root:
+#   python3 tools/bdf2font.py out.fnt font.bdf
+#       1 bit per pixel, from any BDF bitmap font (X11 fonts, or TTFs
+#       rasterised with e.g. otf2bdf)
+#   python3 tools/bdf2font.py --aa out.fnt font-2x.bdf
+#       2 bits per pixel, antialiased: the BDF is drawn at twice the wanted
+#       size and each 2x2 block becomes one pixel with four shades
+#   python3 tools/bdf2font.py --builtin out.fnt
+#       the built-in 8x8 font of font.py made proportional (blank columns
+#       trimmed), so more of a name fits in the same width
+# Options: --range 32-126 (char codes kept), --page 32 (glyphs per page).
+# Copy the result to /sd/fonts/ on the device.
+import sys, struct
+sys.path.insert(0, '')
+sys.modules.setdefault('ustruct', struct)
+
+from fontfile import FontFile, HEAD
+
+def read_bdf(path):
+    # -> height, ascent, {code: (advance, rows of 0/1 pixels)}
+    glyphs = {}
+    ascent = descent = 0
+    with open(path) as f:
+        lines = iter(f.read().splitlines())
+    for line in lines:
+        words = line.split()
+        if not words: continue
+        if words[0] == "FONT_ASCENT": ascent = int(words[1])
+        elif words[0] == "FONT_DESCENT": descent = int(words[1])
+        elif words[0] == "STARTCHAR":
+            code = adv = None
+            bw = bh = bx = by = 0
+            for line in lines:
+                words = line.split()
+                if not words: continue
+                if words[0] == "ENCODING": code = int(words[1])
+                elif words[0] == "DWIDTH": adv = int(words[1])
+                elif words[0] == "BBX": bw, bh, bx, by = [int(v) for v in words[1:5]]
+                elif words[0] == "BITMAP":
+                    bits = []
+                    for _ in range(bh):
+                        v = int(next(lines), 16)
+                        n = (bw + 7) // 8 * 8
+                        bits.append([(v >> (n - 1 - i)) & 1 for i in range(bw)])
+                elif words[0] == "ENDCHAR": break
+            if code is None or code < 0: continue
+            if adv is None: adv = bw + bx
+            glyphs[code] = (adv, bw, bh, bx, by, bits)
+    if not ascent: raise ValueError(path + ": no FONT_ASCENT")
+    height = ascent + descent
+    out = {}
+    for code, (adv, bw, bh, bx, by, bits) in glyphs.items():
+        # Place the bitmap on a height x adv canvas by its baseline offset
+        rows = [[0] * adv for _ in range(height)]
+        top = ascent - by - bh
+        for r in range(bh):
+            for c in range(bw):
+                y, x = top + r, bx + c
+                if bits[r][c] and 0 <= y < height and 0 <= x < adv: rows[y][x] = 1
+        out[code] = (adv, rows)
+    return height, out
+
+def downsample(height, glyphs):
+    # 2x2 coverage -> shades 0..3
+    out = {}
+    for code, (adv, rows) in glyphs.items():
+        w = (adv + 1) // 2
+        shaded = []
+        for y in range(0, height - 1, 2):
+            line = []
+            for x in range(w):
+                n = 0
+                for dy in (0, 1):
+                    for dx in (0, 1):
+                        if 2 * x + dx < adv: n += rows[y + dy][2 * x + dx]
+                line.append((n * 3 + 2) // 4)
+            shaded.append(line)
+        out[code] = (w, shaded)
+    return height // 2, out
+
+def builtin():
+    # font.py's 8x8 font with blank columns trimmed and one left between chars
+    from font import byte_font
+    out = {}
+    for code in range(32, 127):
+        rows = [[(byte_font[(code - 32) * 8 + r] >> (7 - c)) & 1 for c in range(8)] for r in range(8)]
+        used = [c for c in range(8) if any(row[c] for row in rows)]
+        if not used:
+            out[code] = (4, [[0] * 4 for _ in range(8)])
+            continue
+        lo, hi = used[0], used[-1]
+        out[code] = (hi - lo + 2, [row[lo:hi + 1] + [0] for row in rows])
+    return 8, out
+
+def encode(height, bpp, glyphs, first, last, page):
+    codes = range(first, last + 1)
+    count = len(codes)
+    if count > 65535: raise ValueError("too many glyphs")
+    widths = bytearray()
+    bitmaps = []
+    for code in codes:
+        w, rows = glyphs.get(code, (0, [[]] * height))
+        if w > 255: raise ValueError("char {} is wider than 255".format(code))
+        widths.append(w)
+        data = bytearray()
+        for row in rows:
+            v = 0
+            for p in row: v = v << bpp | p
+            nbits = (w * bpp + 7) // 8 * 8
+            v <<= nbits - w * bpp
+            data += v.to_bytes(nbits // 8, "big")
+        bitmaps.append(bytes(data))
+    pages = (count + page - 1) // page
+    pos = struct.calcsize(HEAD) + count + (pages + 1) * 4
+    offsets = []
+    for p in range(pages):
+        offsets.append(pos)
+        pos += sum(len(b) for b in bitmaps[p * page:(p + 1) * page])
+    offsets.append(pos)
+    out = bytearray(struct.pack(HEAD, b"FN", height, bpp, first, count, page))
+    out += widths
+    out += struct.pack(">{}I".format(pages + 1), *offsets)
+    for b in bitmaps: out += b
+    return bytes(out)
+
+def check(path, height, bpp, glyphs, first, last):
+    # Read the file back the way the device does and compare every glyph
+    font = FontFile(path, budget=1 << 30)
+    assert (font.height, font.bpp) == (height, bpp)
+    for code in range(first, last + 1):
+        if code not in glyphs: continue
+        w, rows = glyphs[code]
+        data, start, fw = font.glyph(code)
+        assert fw == w, "char {}: width".format(code)
+        rb = font.row_bytes(w)
+        for y in range(height):
+            v = int.from_bytes(data[start + y * rb:start + (y + 1) * rb], "big")
+            got = [(v >> (rb * 8 - bpp * (x + 1))) & ((1 << bpp) - 1) for x in range(w)]
+            assert got == rows[y], "char {} row {} does not round-trip".format(code, y)
+    font.close()
+
+def main():
+    args = sys.argv[1:]
+    aa = "--aa" in args
+    use_builtin = "--builtin" in args
+    first, last, page = 32, 126, 32
+    if "--range" in args:
+        i = args.index("--range")
+        first, last = [int(v) for v in args[i + 1].split("-")]
+        del args[i:i + 2]
+    if "--page" in args:
+        i = args.index("--page")
+        page = int(args[i + 1])
+        del args[i:i + 2]
+    args = [a for a in args if not a.startswith("--")]
+    if len(args) != (1 if use_builtin else 2):
+        print("usage: bdf2font.py [--aa] [--range 32-126] [--page 32] out.fnt font.bdf")
+        print("       bdf2font.py --builtin out.fnt")
+        sys.exit(1)
+    if use_builtin: height, glyphs = builtin()
+    else: height, glyphs = read_bdf(args[1])
+    bpp = 1
+    if aa:
+        height, glyphs = downsample(height, glyphs)
+        bpp = 2
+    data = encode(height, bpp, glyphs, first, last, page)
+    with open(args[0], "wb") as f:
+        f.write(data)
+    check(args[0], height, bpp, glyphs, first, last)
+    print("{}: {} glyphs, {} px high, {} bpp, {} bytes".format(args[0], last - first + 1, height, bpp, len(data)))
+
+main()
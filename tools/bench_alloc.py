@@ -0,0 +1,122 @@
+# Host-side allocation check for the display driver. Exits non-zero when
+# steady-state drawing goes over its budget.
+# Run from the repo root with either:
+#   python3 tools/bench_alloc.py          (CPython, uses tracemalloc)
+#   micropython tools/bench_alloc.py      (unix port, uses gc.mem_alloc)
+# The unix port counts every byte allocated per run. tracemalloc only sees
+# the peak, so under CPython slices freed straight away do not show; the
+# buffers handed to SPI are checked on both: a run may not need new ones.
+import sys, gc, time
+sys.path.insert(0, '')
+
+try:
+    import ustruct
+except ImportError:
+    import struct
+    sys.modules['ustruct'] = struct
+if not hasattr(time, 'sleep_ms'):
+    time.sleep_ms = lambda ms: None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from ili9341 import Display
+
+RUNS = 20
+BELTS = (0xFFFF, 0xFFE0, 0xFD20, 0x07E0, 0x001F, 0x8010, 0xA145, 0xF800, 0x3186)
+
+# label: (bytes per run on MicroPython, peak bytes under CPython)
+BUDGETS = {
+    "fill_rectangle": (0, 1024),
+    "draw_text": (256, 2048),
+    "list page": (2048, 4096),
+    "belts page": (2048, 4096),
+}
+
+class MockPin:
+    OUT = 1
+    def init(self, *args, **kwargs): pass
+    def __call__(self, value=None): pass
+
+class MockSPI:
+    # Keeps every buffer written, so one made per call shows up as new
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+        self.seen = {}
+    def write(self, buf):
+        self.writes += 1
+        self.bytes += len(buf)
+        self.seen[id(buf)] = buf
+
+def draw_list_page(display):
+    # Roughly what screen_list() does for one page of 8 locks
+    display.fill_rectangle(0, 0, 240, 320, 0x0000)
+    display.fill_rectangle(0, 0, 240, 35, 0x3186)
+    display.draw_text("GREEN LOCKS", 10, 10, 0xFFFF, 0x3186)
+    y = 45
+    for i in range(8):
+        display.fill_rectangle(5, y, 230, 25, 0x3186)
+        display.draw_text(ROWS[i], 10, y + 8, 0xFEA0, 0x3186)
+        y += 28
+
+def draw_belts_page(display):
+    # screen_belts(): nine belt colored buttons, more colors than one page
+    # of anything else
+    display.fill_rectangle(0, 0, 240, 320, 0x0000)
+    display.fill_rectangle(0, 0, 240, 35, 0x3186)
+    display.draw_text("SELECT BELT", 10, 10, 0xFFFF, 0x3186)
+    display.fill_rectangle(180, 5, 55, 25, 0x632C)
+    display.draw_text("MENU", 191, 13, 0xFFFF, 0x632C)
+    for i in range(9):
+        x = 10 if i % 2 == 0 else 125
+        y = 40 + (i // 2) * 50
+        display.fill_rectangle(x, y, 105, 40, BELTS[i])
+        display.draw_text("BELT", x + 36, y + 16, 0x0000, BELTS[i])
+
+# Strings are built once so the benchmark measures the driver, not format()
+ROWS = ["* Master Lock No. {}".format(i) for i in range(8)]
+
+def measure(label, fn, display, spi):
+    fn(display) # warm caches and fill buffers
+    buffers = len(spi.seen)
+    misses = display.fill_misses
+    if tracemalloc:
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(RUNS): fn(display)
+        used = tracemalloc.get_traced_memory()[1] - start
+        tracemalloc.stop()
+        budget = BUDGETS[label][1]
+        line = "{:<14} peak {:>6} bytes over {} runs".format(label, used, RUNS)
+    else:
+        gc.collect()
+        gc.disable()
+        start = gc.mem_alloc()
+        for _ in range(RUNS): fn(display)
+        used = (gc.mem_alloc() - start) // RUNS
+        gc.enable()
+        budget = BUDGETS[label][0]
+        line = "{:<14} {:>6} bytes/run".format(label, used)
+    new = len(spi.seen) - buffers
+    misses = display.fill_misses - misses
+    ok = used <= budget and new == 0 and misses == 0
+    print("{} (budget {}), {} new SPI buffers, {} fill misses  {}".format(line, budget, new, misses, "ok" if ok else "OVER"))
+    return ok
+
+def main():
+    spi = MockSPI()
+    display = Display(spi, dc=MockPin(), cs=MockPin())
+    text = "Locksport Dojo List Row"
+    ok = measure("fill_rectangle", lambda d: d.fill_rectangle(3, 7, 101, 13, 0xF800), display, spi)
+    ok = measure("draw_text", lambda d: d.draw_text(text, 10, 10, 0xFFFF, 0x3186), display, spi) and ok
+    ok = measure("list page", draw_list_page, display, spi) and ok
+    ok = measure("belts page", draw_belts_page, display, spi) and ok
+    g = display.glyphs
+    print("glyph cache: {} hits / {} misses, {} cached".format(g.hits, g.misses, len(g.glyphs)))
+    if not ok: sys.exit(1)
+
+main()
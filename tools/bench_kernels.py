@@ -0,0 +1,40 @@
+# Micro-benchmark of the pixel kernels in kernels.py: plain Python against
+# the viper builds in kernels_native.py. On the CYD:
+#   mpremote cp kernels.py kernels_native.py : + run tools/bench_kernels.py
+# Under CPython (python3 tools/bench_kernels.py) only the Python row is shown.
+import sys, time
+sys.path.insert(0, '')
+
+import kernels
+from font import byte_font
+
+RUNS = 500
+
+try:
+    ticks_us, ticks_diff = time.ticks_us, time.ticks_diff
+except AttributeError:
+    ticks_us = lambda: int(time.perf_counter() * 1000000)
+    ticks_diff = lambda a, b: a - b
+
+def rate(fn):
+    start = ticks_us()
+    for i in range(RUNS): fn(i)
+    us = max(1, ticks_diff(ticks_us(), start))
+    return RUNS * 1000000 // us
+
+def bench(label, expand_glyph, expand_cells):
+    glyph = bytearray(128)
+    digit = bytes([1,1,1,1,0,1,1,1,1,1,0,1,1,1,1]) # "8"
+    cells = bytearray(21 * 35 * 2)
+    # Every printable char in turn (a glyph cache miss), then one stopwatch
+    # digit at the size the TIMER screen uses
+    glyphs = rate(lambda i: expand_glyph(byte_font, (i % 95) * 8, glyph, 0xFFFF, 0x3186))
+    digits = rate(lambda i: expand_cells(cells, 0, 42, digit, 3, 7, 0, 35, 0xFFFF, 0x3186))
+    print("{:<8} {:>8} glyphs/s  {:>6} digits/s".format(label, glyphs, digits))
+
+def main():
+    bench("python", kernels.expand_glyph_py, kernels.expand_cells_py)
+    if kernels.NATIVE: bench("viper", kernels.expand_glyph, kernels.expand_cells)
+    else: print("viper    not available (needs MicroPython with the native emitter)")
+
+main()
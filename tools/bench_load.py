@@ -0,0 +1,70 @@
+# Host-side check that booting does not scale with the logbook size.
+# Builds a synthetic 10,000 entry logbook both as the old inline
+# user_progress.json and as per-lock shards (see logbook.py), then compares
+# the peak memory of booting and opening one HISTORY page with each.
+# Exits non-zero if the sharded path goes over BUDGET.
+# Run from the repo root:  python3 tools/bench_load.py
+import sys, os, json, tempfile, tracemalloc
+sys.path.insert(0, '')
+
+from journal import Journal
+from logbook import Logbook
+
+ENTRIES = 10000
+LOCKS = 500
+BUDGET = 16 * 1024 # bytes (CPython sizes)
+
+def synthetic_logs():
+    logs = {}
+    for i in range(ENTRIES):
+        name = "Synthetic Lock No. {}".format(i % LOCKS)
+        logs.setdefault(name, []).append({
+            "date": "2024-{:02d}-{:02d}".format(i % 12 + 1, i % 28 + 1), "tool": "Short Hook",
+            "p_size": "0.025", "t_size": "Med", "style": "TOK", "tension": "Light",
+            "dur": "{:02d}:{:02d}".format(i % 60, i % 59), "rating": i % 5 + 1,
+            "id": "red_{}".format(i % LOCKS)})
+    return logs
+
+def peak(fn):
+    tracemalloc.start()
+    fn()
+    used = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return used
+
+def main():
+    tmp = tempfile.mkdtemp()
+    logs = synthetic_logs()
+    header = {"owned": {}, "picked": {}, "trophies": [], "auto_dim": True, "show_batt": True}
+
+    legacy = os.path.join(tmp, "legacy.json")
+    with open(legacy, "w") as f:
+        json.dump(dict(header, logs=logs, seq=0), f)
+
+    journal = Journal(os.path.join(tmp, "user_progress.json"), os.path.join(tmp, "user_progress.log"))
+    book = Logbook()
+    book.open(os.path.join(tmp, "logs"))
+    book.import_logs(logs.items(), 0)
+    journal.write_snapshot(journal.snapshot_text(dict(header)))
+    del logs, book
+
+    def load_legacy():
+        with open(legacy) as f: json.load(f)
+    pages = []
+    def load_sharded():
+        journal.load_snapshot()
+        book = Logbook()
+        book.open(os.path.join(tmp, "logs"))
+        pages.append(book.page("Synthetic Lock No. 7", 4, 4))
+
+    old = peak(load_legacy)
+    new = peak(load_sharded)
+    print("{} entries / {} locks".format(ENTRIES, LOCKS))
+    print("inline json.load   peak {:>8} bytes".format(old))
+    print("sharded + 1 page   peak {:>8} bytes (budget {})".format(new, BUDGET))
+    print("lock 7 page 2: {} entries".format(len(pages[0])))
+    if new > BUDGET:
+        print("FAIL: sharded load over budget")
+        sys.exit(1)
+
+main()
@@ -0,0 +1,38 @@
+# On-device benchmark of touch sampling, one line per SPI backend.
+# Unlike the other tools this one runs on the CYD itself:
+#   mpremote cp xpt2046.py : + run tools/bench_touch.py
+# It does not need a finger on the panel: conversions take the same time
+# either way.
+import machine, time
+from xpt2046 import Touch
+
+RUNS = 500
+SCK, MOSI, MISO, CS = 25, 32, 39, 33
+
+def pins():
+    return dict(sck=machine.Pin(SCK), mosi=machine.Pin(MOSI), miso=machine.Pin(MISO))
+
+def rate(fn):
+    start = time.ticks_us()
+    for _ in range(RUNS): fn()
+    us = time.ticks_diff(time.ticks_us(), start)
+    return RUNS * 1000000 // us
+
+def bench(label, spi, **kwargs):
+    touch = Touch(spi, cs=machine.Pin(CS), **kwargs)
+    # X + Y as two transfers (how samples used to be read) vs one batched
+    # X/Y/Z1/Z2 transfer, then a full averaged point with no settle pause
+    single = rate(lambda: (touch.send_command(0xD0), touch.send_command(0x90)))
+    batch = rate(touch.read_batch)
+    touch.settle_ms = 0
+    point = rate(touch.get_touch)
+    print("{:<22} {:>6} x/y/s  {:>6} batch/s  {:>5} points/s".format(label, single, batch, point))
+
+def main():
+    bench("SoftSPI 1 MHz", machine.SoftSPI(baudrate=1000000, **pins()))
+    for hz in (1000000, 2000000, 2500000):
+        spi = machine.SPI(2, baudrate=hz, **pins())
+        bench("SPI(2) {:.1f} MHz".format(hz / 1000000), spi)
+        spi.deinit()
+
+main()
@@ -0,0 +1,29 @@
+# Compile locks.json into the binary catalog the device pages from.
+# Run from the repo root:
+#   python3 tools/build_catalog.py [locks.json] [locks.bin]
+# then copy locks.bin to /sd/data/ next to locks.json. (The device also
+# builds it on boot if it is missing, damaged or made from another
+# locks.json, at the cost of one json.load.)
+import sys, json, struct
+sys.path.insert(0, '')
+sys.modules.setdefault('ustruct', struct)
+
+from catalog import Catalog, compile_catalog, source_stamp
+
+def main():
+    src = sys.argv[1] if len(sys.argv) > 1 else "locks.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "locks.bin"
+    with open(src, "r") as f:
+        locks = json.load(f)
+    compile_catalog(locks, dst, source_stamp(src))
+
+    # Read every lock back and compare with the source
+    cat = Catalog(dst, list(locks))
+    for belt, entries in locks.items():
+        for n, lock in enumerate(entries):
+            got = cat.lock_at(belt, n)
+            assert got["n"] == lock["n"].encode()[:255].decode(), (belt, n)
+    total = sum(len(v) for v in locks.values())
+    print("{}: {} belts, {} locks".format(dst, len(locks), total))
+
+main()
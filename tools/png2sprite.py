@@ -0,0 +1,138 @@
+# Convert PNGs into the RLE sprite format of sprite.py.
+# Run from the repo root:
+#   python3 tools/png2sprite.py sprites.py assets/skull.png assets/belt.png ...
+#       writes a module with one bytes constant per PNG (SKULL, BELT, ...)
+#   python3 tools/png2sprite.py trophy.spr assets/trophy.png
+#       writes one sprite file, for sprite.load() from the SD card
+# Pixels with alpha under 128 become the transparent color. At most 16
+# colors (transparent included) per image, at most 255x255 pixels.
+# Reads 8-bit, non-interlaced PNGs of any color type with only the stdlib.
+import sys, os, struct, zlib
+sys.path.insert(0, '')
+sys.modules.setdefault('ustruct', struct)
+
+from sprite import Sprite
+
+def color565(r, g, b):
+    return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
+
+def read_png(path):
+    # -> width, height, rows of (r, g, b, a)
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != b"\x89PNG\r\n\x1a\n": raise ValueError(path + ": not a PNG")
+    pos = 8
+    idat = b""
+    plte = trns = None
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, ctype, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE": plte = body
+        elif kind == b"tRNS": trns = body
+        elif kind == b"IDAT": idat += body
+        elif kind == b"IEND": break
+    if depth != 8 or interlace: raise ValueError(path + ": only 8-bit, non-interlaced PNGs")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[ctype]
+    raw = zlib.decompress(idat)
+    stride = width * channels
+    prev = bytearray(stride)
+    rows = []
+    i = 0
+    for _ in range(height):
+        ftype = raw[i]
+        line = bytearray(raw[i + 1:i + 1 + stride])
+        i += 1 + stride
+        for x in range(stride):
+            a = line[x - channels] if x >= channels else 0
+            b = prev[x]
+            c = prev[x - channels] if x >= channels else 0
+            if ftype == 1: line[x] = (line[x] + a) & 0xFF
+            elif ftype == 2: line[x] = (line[x] + b) & 0xFF
+            elif ftype == 3: line[x] = (line[x] + (a + b) // 2) & 0xFF
+            elif ftype == 4:
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                pred = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                line[x] = (line[x] + pred) & 0xFF
+        prev = line
+        row = []
+        for x in range(width):
+            px = line[x * channels:(x + 1) * channels]
+            if ctype == 0: row.append((px[0], px[0], px[0], 255))
+            elif ctype == 2: row.append((px[0], px[1], px[2], 255))
+            elif ctype == 3:
+                n = px[0]
+                alpha = trns[n] if trns is not None and n < len(trns) else 255
+                row.append((plte[n * 3], plte[n * 3 + 1], plte[n * 3 + 2], alpha))
+            elif ctype == 4: row.append((px[0], px[0], px[0], px[1]))
+            else: row.append(tuple(px))
+        rows.append(row)
+    return width, height, rows
+
+def encode(width, height, rows):
+    if width > 255 or height > 255: raise ValueError("sprites are at most 255x255")
+    # Palette in order of first use; None stands for transparent
+    palette = []
+    pixels = []
+    for row in rows:
+        out = []
+        for r, g, b, a in row:
+            c = None if a < 128 else color565(r, g, b)
+            if c not in palette: palette.append(c)
+            out.append(palette.index(c))
+        pixels.append(out)
+    if len(palette) > 16: raise ValueError("{} colors, at most 16".format(len(palette)))
+    transparent = palette.index(None) if None in palette else 255
+    data = bytearray(b"SP")
+    data += bytes((width, height, len(palette), transparent))
+    for c in palette: data += struct.pack(">H", c or 0)
+    for out in pixels:
+        x = 0
+        while x < width:
+            n = 1
+            while x + n < width and n < 16 and out[x + n] == out[x]: n += 1
+            data.append((n - 1) << 4 | out[x])
+            x += n
+    return bytes(data), pixels, palette
+
+def check(data, pixels, palette):
+    # Decode the result the way the device does and compare
+    s = Sprite(data)
+    for y, out in enumerate(pixels):
+        got = []
+        for i in range(s.rows[y], s.rows[y + 1]):
+            got += [data[i] & 15] * ((data[i] >> 4) + 1)
+        assert got == out, "row {} does not round-trip".format(y)
+    assert s.palette == [c or 0 for c in palette]
+
+def main():
+    if len(sys.argv) < 3:
+        print("usage: png2sprite.py out.py|out.spr image.png ...")
+        sys.exit(1)
+    dst, srcs = sys.argv[1], sys.argv[2:]
+    sprites = []
+    for src in srcs:
+        data, pixels, palette = encode(*read_png(src))
+        check(data, pixels, palette)
+        name = os.path.splitext(os.path.basename(src))[0].upper()
+        sprites.append((name, src, data))
+        print("{}: {} bytes, {} colors".format(src, len(data), len(palette)))
+    if dst.endswith(".py"):
+        with open(dst, "w") as f:
+            f.write("# Save as '{}'\n".format(os.path.basename(dst)))
+            f.write("# Sprites for sprite.Sprite, made by tools/png2sprite.py. Do not edit:\n")
+            f.write("# change the PNGs and run it again.\n")
+            for name, src, data in sprites:
+                f.write("\n# {}\n{} = (\n".format(src, name))
+                for i in range(0, len(data), 32):
+                    f.write("    {!r}\n".format(data[i:i + 32]))
+                f.write(")\n")
+    else:
+        if len(sprites) != 1: raise SystemExit("a .spr file holds one sprite")
+        with open(dst, "wb") as f:
+            f.write(sprites[0][2])
+
+main()
@@ -0,0 +1,62 @@
+# Host-side check that Display.draw_text sends one window and one data
+# write per string, however long it is, against a fake SPI bus and pins.
+# Exits non-zero on a mismatch. Run from the repo root:
+#   python3 tools/spi_count.py
+import sys, time
+sys.path.insert(0, '')
+
+try:
+    import ustruct
+except ImportError:
+    import struct
+    sys.modules['ustruct'] = struct
+if not hasattr(time, 'sleep_ms'):
+    time.sleep_ms = lambda ms: None
+
+from ili9341 import Display
+
+class MockPin:
+    OUT = 1
+    def __init__(self): self.value = 1
+    def init(self, *args, **kwargs): pass
+    def __call__(self, value=None):
+        if value is not None: self.value = value
+        return self.value
+
+class MockSPI:
+    # Logs each transaction (cs low .. cs high) as [command, data writes]
+    def __init__(self, dc, cs):
+        self.dc = dc
+        self.cs = cs
+        self.log = []
+    def write(self, buf):
+        if self.cs.value: raise AssertionError("write with cs high")
+        if self.dc.value == 0:
+            self.log.append([buf[0], 0])
+        else:
+            self.log[-1][1] += 1
+
+def count(spi, fn):
+    spi.log = []
+    fn()
+    return [tuple(t) for t in spi.log]
+
+def main():
+    dc, cs = MockPin(), MockPin()
+    spi = MockSPI(dc, cs)
+    display = Display(spi, dc=dc, cs=cs)
+    window = [(0x2A, 1), (0x2B, 1)]
+    bad = 0
+    for text in ("A", "MENU", "Locksport Dojo List Row", "x" * 40):
+        got = count(spi, lambda: display.draw_text(text, 0, 10, 0xFFFF, 0x3186))
+        ok = got == window + [(0x2C, 1)]
+        if not ok: bad += 1
+        print("{:<24} {:>3} commands  {}".format(text[:24], len(got), "ok" if ok else "FAIL {}".format(got)))
+    got = count(spi, lambda: display.draw_text("", 0, 10, 0xFFFF, 0x3186))
+    if got: bad += 1
+    print("{:<24} {:>3} commands  {}".format("(empty)", len(got), "ok" if not got else "FAIL"))
+    if bad:
+        print("{} mismatches".format(bad))
+        sys.exit(1)
+
+main()
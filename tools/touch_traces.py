@@ -0,0 +1,104 @@
+# Host-side check of the touch pipeline (xpt2046.Touch + Gestures).
+# Each trace is a list of raw XPT2046 samples, one per 10 ms main loop pass,
+# replayed through a fake SPI bus; the gestures that come out are compared
+# with what a person doing that would expect. Exits non-zero on a mismatch.
+# Run from the repo root:  python3 tools/touch_traces.py
+import sys, time, types
+sys.path.insert(0, '')
+
+clock = [0]
+time.ticks_ms = lambda: clock[0]
+time.ticks_add = lambda a, b: a + b
+time.ticks_diff = lambda a, b: a - b
+time.sleep_ms = lambda ms: None
+
+class Pin:
+    OUT = 1
+    IN = 0
+    def init(self, *args, **kwargs): pass
+    def __call__(self, value=None): pass
+
+machine = types.ModuleType('machine')
+machine.Pin = Pin
+machine.SPI = object
+sys.modules['machine'] = machine
+
+from xpt2046 import Touch, Gestures, TAP, LONG, REPEAT, SWIPE_LEFT, SWIPE_RIGHT, DRAG, FLING
+
+class TraceSPI:
+    # Answers every conversion command in a transfer with the current raw
+    # sample; pressure reads as a firm press unless the sample is (0, 0)
+    def __init__(self):
+        self.raw = (0, 0)
+    def write_readinto(self, tx, rx):
+        touched = self.raw != (0, 0)
+        for i in range(0, len(tx) - 2, 2):
+            channel = (tx[i] >> 4) & 7
+            if not tx[i] & 0x80: continue
+            v = {5: self.raw[0], 1: self.raw[1], 3: 600 if touched else 0, 4: 3000 if touched else 4095}[channel]
+            rx[i + 1] = (v << 3) >> 8
+            rx[i + 2] = (v << 3) & 0xFF
+
+def raw(x, y):
+    # Screen point -> raw reading, inverting the default calibration
+    return (768 + x * (3472 - 768) // 240, 3684 + y * (357 - 3684) // 320)
+
+def hold(x, y, ms, jitter=0):
+    return [raw(x + (jitter if i % 2 else -jitter), y) for i in range(ms // 10)]
+
+def slide(x0, x1, y, ms):
+    n = ms // 10
+    return [raw(x0 + (x1 - x0) * i // (n - 1), y) for i in range(n)]
+
+def vslide(x, y0, y1, ms):
+    n = ms // 10
+    return [raw(x, y0 + (y1 - y0) * i // (n - 1)) for i in range(n)]
+
+UP = [(0, 0)] * 3
+
+TRACES = [
+    ("tap", hold(120, 150, 80) + UP, [TAP]),
+    ("tap with jitter", hold(120, 150, 80, jitter=5) + UP, [TAP]),
+    ("long press", hold(120, 150, 800) + UP, [LONG]),
+    ("swipe left", slide(200, 40, 160, 120) + UP, [SWIPE_LEFT]),
+    ("swipe right", slide(40, 200, 160, 120) + UP, [SWIPE_RIGHT]),
+    ("short drag", slide(100, 140, 160, 120) + UP, []),
+    ("edge noise", [(4050, 4050)] * 3 + UP, []),
+    # y < 100 counts as a repeatable control below: acts on press, then
+    # every 120 ms after a 400 ms delay
+    ("hold < >", hold(30, 60, 800) + UP, [TAP, REPEAT, REPEAT, REPEAT, REPEAT]),
+    ("tap < >", hold(30, 60, 80) + UP, [TAP]),
+    # y >= 200 is a draggable list below; runs of DRAGs count once
+    ("drag", vslide(120, 300, 220, 800) + hold(120, 220, 200) + UP, [DRAG]),
+    ("fling", vslide(120, 300, 220, 80) + UP, [DRAG, FLING]),
+    ("drag sideways", slide(200, 40, 260, 120) + UP, [SWIPE_LEFT]),
+    ("slide off list", vslide(120, 150, 60, 120) + UP, []),
+]
+
+def run(samples):
+    spi = TraceSPI()
+    touch = Touch(spi, Pin())
+    gestures = Gestures(touch, lambda x, y: y < 100, draggable=lambda x, y: y >= 200)
+    out = []
+    for sample in samples:
+        spi.raw = sample
+        touch.poll()
+        while True:
+            g = gestures.next()
+            if g is None: break
+            if g[0] != DRAG or not out or out[-1] != DRAG: out.append(g[0])
+        clock[0] += 10
+    return out
+
+def main():
+    failed = 0
+    for name, samples, want in TRACES:
+        got = run(samples)
+        ok = got == want
+        if not ok: failed += 1
+        print("{:<16} {}  {}".format(name, "ok  " if ok else "FAIL", got))
+    if failed:
+        print("{} trace(s) failed".format(failed))
+        sys.exit(1)
+
+main()
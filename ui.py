@@ -0,0 +1,96 @@
+# Save as 'ui.py'
+# Retained widgets: each one remembers the arguments it was last painted
+# with, so a screen repaints only the widgets whose state changed.
+
+class Widget:
+    def __init__(self, draw, args):
+        self.draw = draw
+        self.args = args
+        self.drawn = None
+
+    def dirty(self):
+        return self.args != self.drawn
+
+    def paint(self):
+        self.draw(*self.args)
+        self.drawn = self.args
+
+class View:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.widgets = {}
+        self.order = []
+
+    def set(self, name, draw, *args):
+        # Describe a widget: draw(*args) paints it. Unchanged args = no repaint
+        w = self.widgets.get(name)
+        if w is None:
+            self.widgets[name] = Widget(draw, args)
+            self.order.append(name)
+        else:
+            w.draw = draw
+            w.args = args
+
+    def render(self, full=False):
+        painted = 0
+        for name in self.order:
+            w = self.widgets[name]
+            if full or w.dirty():
+                w.paint()
+                painted += 1
+        return painted
+
+# Tap targets: a screen adds its regions while it draws, with the same
+# geometry it paints, so hit boxes cannot drift from the buttons. Regions are
+# filed by BAND pixel rows; a tap only looks at the few in its band, and
+# where regions overlap the one added last wins.
+class HitMap:
+    def __init__(self, height=320, band=40):
+        self.band = band
+        self.bands = [[] for _ in range((height + band - 1) // band)]
+        self.gestures = {}
+
+    def clear(self):
+        for b in self.bands: del b[:]
+        self.gestures = {}
+
+    def add(self, x, y, w, h, fn, *args):
+        self._file((x, y, x + w, y + h, fn, args))
+
+    def area(self, x, y, w, h, fn):
+        # A region whose content moves (a scrolling list): fn(x, y) gets
+        # the tap point and works out what is there
+        self._file((x, y, x + w, y + h, fn, None))
+
+    def _file(self, r):
+        for i in range(max(0, r[1] // self.band), min(len(self.bands), (r[3] - 1) // self.band + 1)):
+            self.bands[i].append(r)
+
+    def gesture(self, kind, fn, *args):
+        # Whole-screen gestures (swipes, drags) that have no place of their own
+        self.gestures[kind] = (fn, args)
+
+    def find(self, x, y):
+        i = y // self.band
+        if i < 0 or i >= len(self.bands): return None
+        b = self.bands[i]
+        for j in range(len(b) - 1, -1, -1):
+            r = b[j]
+            if r[0] <= x < r[2] and r[1] <= y < r[3]: return r
+        return None
+
+    def tap(self, x, y):
+        r = self.find(x, y)
+        if r is None: return False
+        if r[5] is None: r[4](x, y)
+        else: r[4](*r[5])
+        return True
+
+    def fire(self, kind, *args):
+        # args (what a DRAG or FLING measured) follow the registered ones
+        g = self.gestures.get(kind)
+        if g is None: return False
+        g[0](*(g[1] + args))
+        return True
@@ -2,59 +2,169 @@
 from machine import Pin, SPI
 import time
 
+# Batched conversion: Z1, Z2, Y, X with the ADC kept on, then X again with
+# power down so PENIRQ is re-enabled. Each command byte goes out while the
+# previous result is still being clocked in
+BATCH = b'\xB1\x00\xC1\x00\x91\x00\xD1\x00\xD0\x00\x00'
+
+# Event kinds in the queue
+PRESS = 1
+MOVE = 2
+RELEASE = 3
+
 class Touch:
     #  CALIBRATION (768, 3684) -> (3472, 357)
-    def __init__(self, spi, cs, int_pin=None, cal_x0=768, cal_y0=3684, cal_x1=3472, cal_y1=357):
+    # spi may be a SoftSPI or a hardware SPI of its own (the display is on
+    # another bus); baudrate, if given, is set on it
+    def __init__(self, spi, cs, int_pin=None, cal_x0=768, cal_y0=3684, cal_x1=3472, cal_y1=357, queue=16,
+                 baudrate=None, samples=3, settle_ms=2, z_min=200):
         self.spi = spi
         self.cs = cs
         self.cs.init(self.cs.OUT, value=1)
         self.rx = bytearray(3)
         self.tx = bytearray(3)
+        self.batch_rx = bytearray(len(BATCH))
+        self.samples = samples     # readings averaged per point
+        self.settle_ms = settle_ms # pause between readings
+        self.z_min = z_min         # pressure below this is not a touch
+        if baudrate: spi.init(baudrate=baudrate)
         self.cal_x0 = cal_x0
         self.cal_y0 = cal_y0
         self.cal_x1 = cal_x1
         self.cal_y1 = cal_y1
-        
+        # Ring buffer of (kind, ticks, x, y) events, preallocated so pushing
+        # never allocates; the oldest event is dropped when it is full
+        self.q_kind = bytearray(queue)
+        self.q_t = [0] * queue
+        self.q_x = [0] * queue
+        self.q_y = [0] * queue
+        self.q_head = 0
+        self.q_len = 0
+        # Pen state: down is set by PENIRQ (or a good sample without it),
+        # pressed once a PRESS with coordinates has been queued
+        self.down = False
+        self.pressed = False
+        self.down_t = 0
+        self.up_t = None
+        self.x = self.y = 0
+        self.sampling = False
+        self.wake = None # optional flag set on every PENIRQ edge (asyncio.ThreadSafeFlag)
+        self.int_pin = int_pin
+        if int_pin is not None:
+            # PENIRQ is open drain, low while the panel is touched
+            int_pin.init(Pin.IN)
+            int_pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._irq)
+
+    def _irq(self, pin):
+        # Only note the edge and its time; sampling needs SPI, so poll() does it.
+        # Conversions make PENIRQ glitch, so edges while sampling are ignored
+        if self.sampling: return
+        if pin.value() == 0:
+            if not self.down:
+                self.down = True
+                self.down_t = time.ticks_ms()
+                self.up_t = None
+        elif self.down:
+            self.up_t = time.ticks_ms()
+        if self.wake: self.wake.set()
+
+    def _push(self, kind, t, x, y):
+        n = len(self.q_kind)
+        if self.q_len == n:
+            self.q_head = (self.q_head + 1) % n
+            self.q_len -= 1
+        i = (self.q_head + self.q_len) % n
+        self.q_kind[i] = kind
+        self.q_t[i] = t
+        self.q_x[i] = x
+        self.q_y[i] = y
+        self.q_len += 1
+
+    def event(self):
+        # Oldest queued (kind, ticks, x, y), or None
+        if not self.q_len: return None
+        i = self.q_head
+        self.q_head = (i + 1) % len(self.q_kind)
+        self.q_len -= 1
+        return (self.q_kind[i], self.q_t[i], self.q_x[i], self.q_y[i])
+
+    def poll(self):
+        # Call from the main loop. With PENIRQ wired nothing is sampled until a
+        # finger is down; without it every call samples the panel
+        if self.int_pin is not None and not self.down: return
+        self.sampling = True
+        p = self.get_touch()
+        self.sampling = False
+        now = time.ticks_ms()
+        if self.int_pin is not None:
+            # PENIRQ can lag a conversion: a good sample means still down
+            up = p is None and self.int_pin.value() == 1
+        else:
+            up = p is None
+            if not up and not self.down:
+                self.down = True
+                self.down_t = now
+        if up:
+            if self.pressed: self._push(RELEASE, self.up_t if self.up_t is not None else now, self.x, self.y)
+            self.down = self.pressed = False
+            self.up_t = None
+        elif p is not None:
+            if not self.pressed:
+                self._push(PRESS, self.down_t, p[0], p[1])
+                self.pressed = True
+            elif p[0] != self.x or p[1] != self.y:
+                self._push(MOVE, now, p[0], p[1])
+            self.x, self.y = p
+
     def get_touch(self):
-        # NOISE FILTER: Take 3 samples. If they are consistent, return the average.
+        # NOISE FILTER: Take `samples` readings. If they are consistent, return the average.
         # If they are wild (noise), return None.
         x1, y1 = self.raw_sample()
         if x1 == 0: return None # No touch
-        
-        # Small delay to let signal settle
-        time.sleep_ms(2) 
-        x2, y2 = self.raw_sample()
-        
-        time.sleep_ms(2)
-        x3, y3 = self.raw_sample()
-        
-        # If any sample was empty, it was just a blip. Ignore it.
-        if x2 == 0 or x3 == 0: return None
-        
-        # Check if samples are close to each other (within 50 raw units)
-        # This proves it's a finger holding still, not a static spike.
-        if abs(x1 - x2) > 50 or abs(x1 - x3) > 50 or abs(y1 - y2) > 50:
-            return None
-            
-        # Average the 3 valid samples for high precision
-        avg_x = (x1 + x2 + x3) // 3
-        avg_y = (y1 + y2 + y3) // 3
-        
-        return self.normalize(avg_x, avg_y)
+        sum_x, sum_y = x1, y1
+        for _ in range(self.samples - 1):
+            # Small delay to let signal settle
+            if self.settle_ms: time.sleep_ms(self.settle_ms)
+            x, y = self.raw_sample()
+
+            # If any sample was empty, it was just a blip. Ignore it.
+            if x == 0: return None
+
+            # Check if samples are close to each other (within 50 raw units)
+            # This proves it's a finger holding still, not a static spike.
+            if abs(x1 - x) > 50 or abs(y1 - y) > 50: return None
+            sum_x += x
+            sum_y += y
+
+        # Average the valid samples for high precision
+        return self.normalize(sum_x // self.samples, sum_y // self.samples)
 
     def raw_sample(self):
-        x = self.send_command(0xD0)
-        y = self.send_command(0x90)
-        # Ignore extreme edge values (often noise)
-        if x < 100 or y < 100 or x > 4000 or y > 4000: 
+        x, y, z = self.read_batch()
+        # Too light a press, or extreme edge values (often noise)
+        if z < self.z_min or x < 100 or y < 100 or x > 4000 or y > 4000:
             return (0, 0)
         return (x, y)
 
-    def send_command(self, cmd):
-        self.tx[0] = cmd
+    def _transfer(self, tx, rx):
         self.cs(0)
-        self.spi.write_readinto(self.tx, self.rx)
+        self.spi.write_readinto(tx, rx)
         self.cs(1)
+
+    def read_batch(self):
+        # Raw (x, y, pressure) in one transaction
+        rx = self.batch_rx
+        self._transfer(BATCH, rx)
+        z1 = (rx[1] << 8 | rx[2]) >> 3
+        z2 = (rx[3] << 8 | rx[4]) >> 3
+        y = (rx[5] << 8 | rx[6]) >> 3
+        x = (rx[9] << 8 | rx[10]) >> 3
+        return x, y, z1 + 4095 - z2
+
+    def send_command(self, cmd):
+        # One conversion on its own (the pre-batch way; see tools/bench_touch.py)
+        self.tx[0] = cmd
+        self._transfer(self.tx, self.rx)
         return (self.rx[1] << 8 | self.rx[2]) >> 3
 
     def normalize(self, x, y):
@@ -62,3 +172,97 @@ class Touch:
         disp_x = (x - self.cal_x0) * 240 // (self.cal_x1 - self.cal_x0)
         disp_y = (y - self.cal_y0) * 320 // (self.cal_y1 - self.cal_y0)
         return (max(0, min(240, disp_x)), max(0, min(320, disp_y)))
+
+# Gestures, as reported by Gestures.next()
+TAP = 1
+LONG = 2
+REPEAT = 3
+SWIPE_LEFT = 4
+SWIPE_RIGHT = 5
+DRAG = 6  # (DRAG, x, px moved down since the last DRAG)
+FLING = 7 # (FLING, x, px/s downwards when let go)
+
+class Gestures:
+    # Turns Touch events into taps, long presses, auto-repeat and swipes.
+    # A press on a repeatable control (repeatable(x, y) is true) acts at once
+    # and repeats while held; anywhere else the tap is reported on release,
+    # so a swipe or a long press never also counts as a tap. A mostly
+    # vertical move that starts where draggable(x, y) is true is reported as
+    # DRAGs while it lasts, then a FLING if the finger was still moving
+    def __init__(self, touch, repeatable=None, long_ms=600, delay_ms=400, repeat_ms=120, slop=12, swipe=60,
+                 draggable=None, fling=300):
+        self.touch = touch
+        self.repeatable = repeatable
+        self.draggable = draggable
+        self.long_ms = long_ms
+        self.delay_ms = delay_ms
+        self.repeat_ms = repeat_ms
+        self.slop = slop       # px a press may wander and still be a tap
+        self.swipe = swipe     # px of horizontal travel for a swipe
+        self.fling = fling     # px/s at release that makes a drag a fling
+        self.out = []
+        self.down = False
+        self.moved = False
+        self.dragging = False
+        self.vy = 0            # smoothed vertical speed while dragging
+        self.fired = False     # the press already produced its gesture
+        self.repeat_at = None
+        self.t0 = self.x0 = self.y0 = self.x = self.y = self.t = 0
+
+    def next(self, now=None):
+        # Next (kind, x, y), or None. Call every loop pass
+        while not self.out:
+            ev = self.touch.event()
+            if ev is None: break
+            self._feed(ev)
+        if not self.out: self._tick(time.ticks_ms() if now is None else now)
+        return self.out.pop(0) if self.out else None
+
+    def _feed(self, ev):
+        kind, t, x, y = ev
+        if kind == PRESS:
+            self.down = True
+            self.moved = self.fired = self.dragging = False
+            self.t0, self.x0, self.y0, self.x, self.y, self.t = t, x, y, x, y, t
+            self.vy = 0
+            self.repeat_at = None
+            if self.repeatable and self.repeatable(x, y):
+                self.out.append((TAP, x, y))
+                self.fired = True
+                self.repeat_at = time.ticks_add(t, self.delay_ms)
+        elif not self.down: return
+        elif kind == MOVE:
+            if self.dragging:
+                dt = time.ticks_diff(t, self.t)
+                if dt > 0: self.vy = (self.vy + (y - self.y) * 1000 // dt) // 2
+                self.out.append((DRAG, x, y - self.y))
+            elif abs(x - self.x0) > self.slop or abs(y - self.y0) > self.slop:
+                self.moved = True
+                self.repeat_at = None
+                if (self.draggable and not self.fired and abs(y - self.y0) > abs(x - self.x0)
+                        and self.draggable(self.x0, self.y0)):
+                    self.dragging = True
+                    self.out.append((DRAG, x, y - self.y0))
+            self.x, self.y, self.t = x, y, t
+        else: # RELEASE
+            self.down = False
+            dx, dy = x - self.x0, y - self.y0
+            if self.dragging:
+                # A finger that stopped before lifting does not fling
+                if abs(self.vy) >= self.fling and time.ticks_diff(t, self.t) < 100:
+                    self.out.append((FLING, x, self.vy))
+            elif self.moved:
+                if abs(dx) >= self.swipe and abs(dx) > 2 * abs(dy):
+                    self.out.append((SWIPE_LEFT if dx < 0 else SWIPE_RIGHT, self.x0, self.y0))
+            elif not self.fired:
+                self.out.append((TAP, self.x0, self.y0))
+
+    def _tick(self, now):
+        if not self.down or self.moved: return
+        if self.repeat_at is not None:
+            if time.ticks_diff(now, self.repeat_at) >= 0:
+                self.out.append((REPEAT, self.x0, self.y0))
+                self.repeat_at = time.ticks_add(now, self.repeat_ms)
+        elif not self.fired and time.ticks_diff(now, self.t0) >= self.long_ms:
+            self.out.append((LONG, self.x0, self.y0))
+            self.fired = True